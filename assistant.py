@@ -0,0 +1,289 @@
+import os
+import json
+import asyncio
+import copy
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from booking import BookingSystem
+from extraction import BookingExtractor
+from fastpath import FastPath, ResponseCache
+from llm import create_model
+from prompt import ContextBuilder
+from sessions import SessionManager
+from telemetry import log, metrics, profiler
+
+class AirlineAssistant:
+    def __init__(self, model=None, booking_system=None, sessions=None, max_inflight=None, fast_path=None):
+        load_dotenv()
+        # The genai client is only built on first use (see the model property)
+        self._model = model
+        self._model_lock = threading.Lock()
+        self.booking_system = booking_system if booking_system is not None else BookingSystem()
+        flight_db = self.booking_system.flight_db
+        
+        self.system_message = f"""
+### Role
+You are a helpful and efficient flight booking assistant for FlightAI. Your goal is to assist users in booking flights, checking availability, and understanding pricing and loyalty points.
+
+### Flight Data
+- Destinations: {', '.join(flight_db.flights.keys())}
+- Routes: {', '.join(f"{origin.title()} to {destination.title()}" for origin, destination in flight_db.routes)}
+- Classes: Economy, Business, First
+- Meal Options: {', '.join(flight_db.meal_options['regular'] + flight_db.meal_options['special'])}
+- Seat Preferences: {', '.join(flight_db.seat_preferences['location'] + flight_db.seat_preferences['section'] + flight_db.seat_preferences['special'])}
+
+### Process
+1. **Understand User Request**:
+   - Identify the user's intent (e.g., book flight, check availability, ask about price).
+   - Ask clarifying questions to gather missing details (e.g., seat preference, meal preferences, medical needs).
+
+2. **Validate Information**:
+   - Ensure all required details are provided and valid:
+     - Full Name (letters and spaces only)
+     - Phone Number (exactly 10 digits)
+     - Passport Number (6-9 uppercase alphanumeric characters)
+     - Email Address (valid format: example@domain.com)
+   - Validate meal preferences, seat preferences, and medical assistance requests.
+
+3. **Provide Information**:
+   - For availability requests: Check and clearly state availability for the requested destination, date, and class.
+   - For price inquiries: Provide the price for the specified destination and class.
+   - Explain loyalty points earned (10% of the total price).
+   - When asked, quote the customer's loyalty points balance from the booking context.
+
+4. **Confirm Booking**:
+   - Confirm booking details with the user.
+   - Proceed with booking if all details are correct and provide a confirmation message with booking ID and confirmation code.
+   - If there are issues (e.g., invalid input, missing details, no availability), inform the user clearly and guide them on how to proceed.
+
+### Rules
+- Always check flight availability before confirming a booking.
+- Be concise and professional in responses.
+- Clearly present booking details, confirmations, and any validation errors.
+- Confirm all special requirements and medical needs.
+- Verify meal preferences match dietary restrictions.
+- Ensure requested seats are available in the chosen class.
+
+### Date Selection Rules
+- Bookings available up to {flight_db.horizon_days} days in advance.
+- Dates must be in YYYY-MM-DD format.
+- No bookings for past dates.
+- Subject to seat availability.
+
+### Example Conversations
+1. **User**: "I want to book a flight to London."
+   **Assistant**: "Sure! Could you please provide your full name, email, passport number, and travel date?"
+
+2. **User**: "What's the price for a business class ticket to Tokyo?"
+   **Assistant**: "A business class ticket to Tokyo costs $4200. Would you like to proceed with booking?"
+
+3. **User**: "I need a vegetarian meal."
+   **Assistant**: "Noted! Your vegetarian meal preference has been added to your booking."
+"""
+        # Booking state is kept per chat session so concurrent users never share a booking
+        self.sessions = sessions if sessions is not None else SessionManager(
+            ttl_seconds=int(os.getenv('FLIGHTLY_SESSION_TTL', '1800')),
+            max_sessions=int(os.getenv('FLIGHTLY_MAX_SESSIONS', '10000'))
+        )
+        self.extractor = BookingExtractor.from_flight_db(flight_db)
+        self.context_builder = ContextBuilder(
+            self.system_message,
+            max_tokens=int(os.getenv('FLIGHTLY_PROMPT_TOKENS', '4000')),
+            keep_turns=int(os.getenv('FLIGHTLY_HISTORY_TURNS', '6'))
+        )
+        # Lookup questions (price, airline, duration, baggage, dates) are answered without the model
+        self.fast_path = fast_path if fast_path is not None else FastPath(flight_db, ResponseCache(
+            max_entries=int(os.getenv('FLIGHTLY_ANSWER_CACHE_SIZE', '1024')),
+            ttl_seconds=int(os.getenv('FLIGHTLY_ANSWER_CACHE_TTL', '3600'))
+        ), ledger=self.booking_system.ledger)
+        self.max_inflight = max_inflight or int(os.getenv('FLIGHTLY_MAX_INFLIGHT', '8'))
+        self._model_slots = asyncio.Semaphore(self.max_inflight)
+        self._booking_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="booking-writer")
+        self.required_fields = ["full_name", "phone", "passport", "email", "destination", "date", "num_tickets", "ticket_class"]
+        
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = self._create_model()
+        return self._model
+
+    def _create_model(self):
+        # FLIGHTLY_MODEL=simulated runs the whole app offline
+        return create_model()
+
+    def validate_booking_details(self, details):
+        return all(field in details for field in self.required_fields)
+        
+    def process_booking(self, details):
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("⚙️ Processing booking with details: %s", json.dumps(details, indent=2))
+
+        try:
+            result = self.booking_system.book_ticket(
+                destination=details.get("destination", ""),
+                num_tickets=int(details.get("num_tickets", 1)),  # Default to 1 if missing
+                ticket_class=details.get("ticket_class", "economy"),  # Default to economy
+                email=details.get("email", ""),
+                date_str=details.get("date", ""),
+                full_name=details.get("full_name", ""),
+                seat_prefs=details.get("seat_preferences"),
+                meal_prefs=details.get("meal_preferences"),
+                medical_needs=details.get("medical_assistance"),
+                special_requests=details.get("special_requests"),
+                origin=details.get("origin")
+            )
+            
+            log.info("🎟️ Booking Result: %s", result)
+
+            return result
+        except Exception as e:
+            log.error("❌ Booking failed: %s", e)
+            return {"error": f"Booking process failed: {str(e)}"}
+
+        
+    def extract_booking_details(self, message, booking=None):
+        # Enhanced information extraction into the session's booking state
+        booking = {} if booking is None else booking
+        return self._apply_booking_details(booking, self.extractor.extract(message))
+
+    def extract_many(self, messages):
+        """Extract booking details from many independent messages in one batch."""
+        return [self._apply_booking_details({}, fields) for fields in self.extractor.extract_many(messages)]
+
+    def _apply_booking_details(self, booking, fields):
+        if "date" in fields:
+            is_valid, _ = self.booking_system.flight_db.is_valid_date(fields["date"])
+            if not is_valid:
+                del fields["date"]
+        seat_location = fields.pop("seat_location", None)
+        if seat_location:
+            booking.setdefault("seat_preferences", {})["location"] = seat_location
+        meals = fields.pop("meal_preferences", None)
+        if meals:
+            booking.setdefault("meal_preferences", []).extend(meals)
+        booking.update(fields)
+        return booking
+
+    def _prepare_turn(self, message, history, request):
+        # 🔑 Look up this user's booking state (Gradio gives every browser session its own hash)
+        session = self.sessions.get(request.session_hash if request is not None else "default")
+        booking = session.current_booking
+        fresh_session = not booking and not history
+
+        # 🛠️ Extract booking details from message
+        with metrics.span("extraction"):
+            fields = self.extractor.extract(message)
+            self._apply_booking_details(booking, dict(fields))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("📝 Extracted Booking Details: %s", json.dumps(booking, indent=2))
+        return session, booking, fields, fresh_session
+
+    def _build_messages(self, message, history, session):
+        # 🗂️ Build the prompt: static system prompt, booking state and the most recent turns within budget
+        booking = session.current_booking
+        with metrics.span("prompt_build"):
+            loyalty_balance = self.booking_system.loyalty_balance(booking["email"]) if "email" in booking else None
+            messages, prompt_tokens, turns_kept = self.context_builder.build(
+                message, history, booking, session.conversation_state, loyalty_balance
+            )
+        log.debug("📏 Prompt tokens: %d (%d of %d past turns kept)", prompt_tokens, turns_kept, len(history))
+        return messages
+
+    def _save_booking(self, booking):
+        log.debug("📝 Updating booking details in the booking store...")
+        booking_result = self.booking_system.book_ticket(
+            destination=booking.get("destination", ""),
+            num_tickets=int(booking.get("num_tickets", 1)),
+            ticket_class=booking.get("ticket_class", "economy"),
+            email=booking["email"],
+            date_str=booking.get("date", ""),
+            full_name=booking.get("full_name", ""),
+            seat_prefs=booking.get("seat_preferences"),
+            meal_prefs=booking.get("meal_preferences"),
+            medical_needs=booking.get("medical_assistance"),
+            special_requests=booking.get("special_requests"),
+            origin=booking.get("origin")
+        )
+        log.info("🎟️ Booking Result: %s", booking_result)
+        return booking_result
+
+    def chat(self, message, history, request=None):
+        with profiler.profile("chat"):
+            return self._chat(message, history, request)
+
+    def _chat(self, message, history, request):
+        log.debug("📩 User Message: %s", message)
+
+        session, booking, fields, fresh_session = self._prepare_turn(message, history, request)
+
+        # ⚡ Answer lookups from the flight database or the answer cache when possible
+        with metrics.span("fast_path"):
+            response_text = self.fast_path.answer(message, fields, booking, history, fresh_session)
+        if response_text is not None:
+            metrics.inc("flightly_chat_turns_total", path="fast")
+            log.debug("⚡ Fast-path Response: %s", response_text)
+        else:
+            # 🚀 Generate LLM response
+            metrics.inc("flightly_chat_turns_total", path="model")
+            messages = self._build_messages(message, history, session)
+            started = time.perf_counter()
+            with metrics.span("model_call"):
+                response = self.model.generate_content(messages)
+                response_text = response.text
+            self.fast_path.remember(message, fields, history, fresh_session, response_text,
+                                    time.perf_counter() - started)
+            log.debug("🤖 LLM Response Before Booking Check: %s", response_text)
+
+        # ✅ Update the booking after every response
+        if "email" in booking:
+            self._save_booking(booking)
+
+        log.debug("📤 Final Response Sent: %s", response_text)
+
+        return response_text
+
+    async def chat_stream(self, message, history, request=None):
+        """Async variant of chat that yields the response as it is generated."""
+        log.debug("📩 User Message: %s", message)
+
+        # Only the synchronous preparation is profiled; the profiler is per-thread and the stream awaits
+        with profiler.profile("chat_stream"):
+            session, booking, fields, fresh_session = self._prepare_turn(message, history, request)
+
+            # ⚡ Answer lookups from the flight database or the answer cache when possible
+            with metrics.span("fast_path"):
+                response_text = self.fast_path.answer(message, fields, booking, history, fresh_session)
+            messages = None if response_text is not None else self._build_messages(message, history, session)
+        if response_text is not None:
+            metrics.inc("flightly_chat_turns_total", path="fast")
+            log.debug("⚡ Fast-path Response: %s", response_text)
+            yield response_text
+        else:
+            # 🚀 Stream the LLM response, with at most max_inflight model calls at once
+            metrics.inc("flightly_chat_turns_total", path="model")
+            response_text = ""
+            async with self._model_slots:
+                started = time.perf_counter()
+                response = await self.model.generate_content_async(messages, stream=True)
+                first_chunk = None
+                async for chunk in response:
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter() - started
+                        metrics.observe("flightly_span_seconds", first_chunk, span="model_first_chunk")
+                    response_text += chunk.text
+                    yield response_text
+                model_seconds = time.perf_counter() - started
+                metrics.observe("flightly_span_seconds", model_seconds, span="model_call")
+                self.fast_path.remember(message, fields, history, fresh_session, response_text, model_seconds)
+            log.debug("🤖 LLM Response Before Booking Check: %s", response_text)
+
+        # ✅ Save the booking off the response path; the single writer keeps each session's saves in order
+        if "email" in booking:
+            self._booking_writer.submit(self._save_booking, copy.deepcopy(booking))
+
+        log.debug("📤 Final Response Sent: %s", response_text)
@@ -0,0 +1,101 @@
+"""Bulk booking benchmark: ``book_many`` against a loop over ``book_ticket``.
+
+Books the same generated requests (a few of them invalid) into a fresh store
+both ways and checks that both end with the same bookings:
+
+    python -m benchmarks.bench_bulk --rows 5000 --store db jsonl
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from booking import BookingSystem
+from booking_store import open_store
+
+CLASSES = ["economy"] * 16 + ["business"] * 3 + ["first"]
+
+
+def generate_requests(rows, destinations, seed=0):
+    rng = random.Random(seed)
+    today = date.today()
+    for idx in range(rows):
+        request = {
+            "email": f"traveller{idx}@example.com",
+            "full_name": f"Traveller {idx}",
+            "destination": rng.choice(destinations),
+            "date": (today + timedelta(days=rng.randrange(1, 30))).isoformat(),
+            "num_tickets": rng.choice([1, 1, 1, 2, 4]),
+            "ticket_class": rng.choice(CLASSES),
+            "meal_preferences": ["vegetarian"] if idx % 7 == 0 else [],
+        }
+        if idx % 100 == 99:
+            request["email"] = "not-an-email"
+        elif idx % 100 == 98:
+            request["date"] = "2000-01-01"
+        yield request
+
+
+def run_loop(booking_system, requests):
+    results = []
+    for request in requests:
+        results.append(booking_system.book_ticket(
+            destination=request["destination"],
+            num_tickets=request["num_tickets"],
+            ticket_class=request["ticket_class"],
+            email=request["email"],
+            date_str=request["date"],
+            full_name=request["full_name"],
+            meal_prefs=request["meal_preferences"],
+        ))
+    return results
+
+
+def run_bulk(booking_system, path, chunk_size):
+    return list(booking_system.import_bookings(path, chunk_size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--store", nargs="+", default=["db", "jsonl"], help="store file extensions to test")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # sold-out flights log a warning per refused booking
+
+    with tempfile.TemporaryDirectory() as tmp:
+        destinations = None
+        request_file = os.path.join(tmp, "requests.jsonl")
+        for ext in args.store:
+            timings = {}
+            for label in ("book_ticket loop", "book_many"):
+                booking_system = BookingSystem(store=open_store(os.path.join(tmp, f"{label.split()[0]}.{ext}")))
+                if destinations is None:
+                    destinations = list(booking_system.flight_db.flights)
+                    with open(request_file, "w", encoding="utf-8") as f:
+                        for request in generate_requests(args.rows, destinations):
+                            f.write(json.dumps(request) + "\n")
+                started = time.perf_counter()
+                if label == "book_many":
+                    results = run_bulk(booking_system, request_file, args.chunk_size)
+                else:
+                    with open(request_file, encoding="utf-8") as f:
+                        results = run_loop(booking_system, (json.loads(line) for line in f))
+                elapsed = time.perf_counter() - started
+                booked = sum(1 for result in results if "success" in result)
+                timings[label] = elapsed
+                print(f"{ext:<6} {label:<17} {elapsed * 1000:9.1f} ms  {args.rows / elapsed:9.0f} rows/s  "
+                      f"booked {booked}  failed {len(results) - booked}")
+                seats = booking_system.flight_db.inventory.seats.sum()
+                timings[label + " seats"] = seats
+                booking_system.store.close()
+            assert timings["book_ticket loop seats"] == timings["book_many seats"], "seat inventories differ"
+            print(f"{ext:<6} speedup {timings['book_ticket loop'] / timings['book_many']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
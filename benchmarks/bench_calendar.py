@@ -0,0 +1,70 @@
+"""Availability calendar: per-day Python loops vs vectorized inventory queries.
+
+    python -m benchmarks.bench_calendar --routes 5 500 --days 30 365
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from inventory import SeatInventory
+
+CLASSES = ("economy", "business", "first")
+CAPACITY = {"economy": 100, "business": 20, "first": 10}
+
+
+def build(num_routes, num_days, seed=0):
+    today = date.today()
+    dates = [today + timedelta(days=i) for i in range(num_days)]
+    routes = [f"route{i}" for i in range(num_routes)]
+    inventory = SeatInventory(routes, CLASSES, CAPACITY, horizon_days=num_days, start_day=today)
+    # Sell out a random tenth of the flights so the calendar has gaps
+    rng = random.Random(seed)
+    for route in routes:
+        for day in rng.sample(dates, num_days // 10):
+            inventory.reserve(route, day, "economy", CAPACITY["economy"])
+    return inventory, routes, dates
+
+
+def loop_dates(inventory, route, n):
+    # The original get_available_dates: strftime, parse and a keyed lookup per day
+    now = datetime.now()
+    available = []
+    for i in range(inventory.horizon_days):
+        date_str = (now + timedelta(days=i)).strftime('%Y-%m-%d')
+        if inventory.available(route, datetime.strptime(date_str, '%Y-%m-%d').date(), "economy") >= n:
+            available.append(date_str)
+    return available
+
+
+def timed(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", type=int, nargs="+", default=[5, 500])
+    parser.add_argument("--days", type=int, nargs="+", default=[30, 365])
+    args = parser.parse_args()
+
+    print(f"{'routes':>7} {'days':>5} {'dates loop':>12} {'dates vec':>11} {'matrix loop':>13} {'matrix vec':>12}")
+    for num_routes in args.routes:
+        for num_days in args.days:
+            inventory, routes, dates = build(num_routes, num_days)
+            route = routes[0]
+            looped, loop_time = timed(lambda: loop_dates(inventory, route, 2), 20)
+            days, vec_time = timed(lambda: inventory.days_with_seats(route, "economy", 2), 20)
+            assert looped == [day.isoformat() for day in days]
+
+            _, matrix_loop_time = timed(lambda: [[inventory.available(r, d, "economy") for d in dates]
+                                                 for r in routes], 1)
+            _, matrix_vec_time = timed(lambda: inventory.availability_matrix("economy"), 20)
+            print(f"{num_routes:>7} {num_days:>5} {loop_time * 1e6:9.0f} us {vec_time * 1e6:8.1f} us "
+                  f"{matrix_loop_time * 1e3:10.1f} ms {matrix_vec_time * 1e3:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
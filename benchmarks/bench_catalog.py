@@ -0,0 +1,112 @@
+"""Indexed catalog search over a large synthetic route network.
+
+Builds a JSON catalog of N routes, loads it with FlightCatalog and compares
+indexed cheapest-fare queries with a linear scan over every route:
+
+    python -m benchmarks.bench_catalog --routes 100000
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from catalog import TICKET_CLASSES, FlightCatalog
+
+AIRLINES = ["British Airways", "Air France", "ANA", "Lufthansa", "Emirates", "Delta", "Qantas", "KLM"]
+
+
+def synthetic_routes(num_routes, num_cities, seed=0):
+    rng = random.Random(seed)
+    cities = [f"City{i:04d}" for i in range(num_cities)]
+    for _ in range(num_routes):
+        origin, destination = rng.sample(cities, 2)
+        economy = rng.randint(150, 2500)
+        yield {
+            "origin": origin,
+            "destination": destination,
+            "airline": rng.choice(AIRLINES),
+            "days": sorted(rng.sample(range(7), rng.randint(1, 7))),
+            "economy": {"price": economy},
+            "business": {"price": economy * 3},
+            "first": {"price": economy * 6},
+        }
+
+
+def linear_cheapest(routes, origin=None, destination=None, ticket_class=None, weekday=None):
+    best = None
+    for route in routes:
+        if destination and route.destination.lower() != destination:
+            continue
+        if origin and route.origin.lower() != origin:
+            continue
+        if weekday is not None and weekday not in route.days:
+            continue
+        for cls, price in route.fares.items():
+            if ticket_class and cls != ticket_class:
+                continue
+            if best is None or price < best[0]:
+                best = (price, route, cls)
+    return best
+
+
+def per_query(fn, queries):
+    started = time.perf_counter()
+    results = [fn(q) for q in queries]
+    return results, (time.perf_counter() - started) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", type=int, default=100_000)
+    parser.add_argument("--cities", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.json")
+        with open(path, "w") as f:
+            json.dump({"routes": list(synthetic_routes(args.routes, args.cities))}, f)
+        started = time.perf_counter()
+        catalog = FlightCatalog.load(path)
+        load_time = time.perf_counter() - started
+        # Second, traced load for memory only; tracing slows the load down too much to time it
+        del catalog
+        tracemalloc.start()
+        catalog = FlightCatalog.load(path)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    print(f"loaded {len(catalog):,} routes in {load_time:.2f}s, {memory / 2**20:,.0f} MiB")
+
+    rng = random.Random(1)
+    today = datetime.now()
+    queries = [
+        {
+            "destination": f"city{rng.randrange(args.cities):04d}",
+            "origin": f"city{rng.randrange(args.cities):04d}" if rng.random() < 0.3 else None,
+            "ticket_class": rng.choice([None, *TICKET_CLASSES]),
+            "day": (today + timedelta(days=rng.randrange(30))).strftime('%Y-%m-%d') if rng.random() < 0.5 else None,
+        }
+        for _ in range(args.queries)
+    ]
+
+    indexed, indexed_time = per_query(lambda q: catalog.cheapest(**q), queries)
+    linear, linear_time = per_query(
+        lambda q: linear_cheapest(catalog.routes, q["origin"], q["destination"], q["ticket_class"],
+                                  datetime.strptime(q["day"], '%Y-%m-%d').weekday() if q["day"] else None),
+        queries,
+    )
+    for offer, best in zip(indexed, linear):
+        assert (offer.price if offer else None) == (best[0] if best else None)
+    print(f"cheapest fare:  indexed {indexed_time * 1e6:9.1f} us/query   linear scan {linear_time * 1e6:9.1f} us/query "
+          f"({linear_time / indexed_time:,.0f}x), results identical")
+
+    _, search_time = per_query(lambda q: catalog.search(origin=q["destination"], day=q["day"], limit=20), queries)
+    print(f"search top-20 departures from a city on a date: {search_time * 1e6:.1f} us/query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""End-to-end benchmark: scripted booking conversations with a simulated model, no network.
+
+Replays multi-turn booking conversations (destination, date, class and party
+size, email, plus price and loyalty questions) through ``chat`` on a thread
+pool or ``chat_stream`` on asyncio, against a store preloaded with
+``--preload`` bookings. Then it times ``extract_booking_details`` and
+``book_ticket`` on their own. It reports p50/p95/p99 latency, throughput and
+peak memory, and can write the results as JSON. With ``--baseline`` it exits
+with status 1 when a latency or throughput figure is more than
+``--tolerance`` worse than the baseline run:
+
+    python -m benchmarks.bench_e2e --conversations 200 --concurrency 16 --json baseline.json
+    python -m benchmarks.bench_e2e --conversations 200 --concurrency 16 --baseline baseline.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from types import SimpleNamespace
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from assistant import AirlineAssistant
+from booking import BookingSystem
+from booking_store import open_store
+from llm import SimulatedModel
+
+CLASSES = ["economy", "economy", "economy", "business", "first"]
+# (section, metric, True if higher is better) compared against --baseline
+# Latency changes below MIN_DELTA_MS are timer noise on microsecond-scale stages, not regressions
+MIN_DELTA_MS = 0.1
+GUARDED = [
+    ("chat_turn", "p95_ms", False), ("chat_turn", "p99_ms", False),
+    ("extract", "p95_ms", False), ("book_ticket", "p95_ms", False),
+    ("throughput", "turns_per_s", True),
+]
+
+
+def percentiles(latencies):
+    ordered = sorted(latencies)
+    if not ordered:
+        return {"count": 0}
+    def at(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {"count": len(ordered), "p50_ms": round(at(0.50), 3), "p95_ms": round(at(0.95), 3),
+            "p99_ms": round(at(0.99), 3), "max_ms": round(ordered[-1] * 1000, 3)}
+
+
+def peak_rss_mib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def conversations(count, cities, first_day, days, seed):
+    """Scripted booking conversations, one list of user messages per conversation."""
+    rng = random.Random(seed)
+    scripts = []
+    for idx in range(count):
+        city = rng.choice(cities).title()
+        ticket_class = rng.choice(CLASSES)
+        tickets = rng.choice([1, 1, 2, 3])
+        day = (first_day + timedelta(days=rng.randrange(1, days))).isoformat()
+        script = []
+        if idx % 3 == 0:
+            script.append(f"What's the price for a {ticket_class} ticket to {city}?")
+        script += [
+            f"Hi, I want to book a flight to {city}.",
+            f"I'd like to travel on {day}.",
+            f"{ticket_class.title()} class please, {tickets} ticket{'s' if tickets > 1 else ''}.",
+            f"My email is traveller{seed}-{idx}@example.com",
+        ]
+        if idx % 4 == 0:
+            script.append("What's my loyalty points balance?")
+        scripts.append(script)
+    return scripts
+
+
+def booking_requests(count, cities, first_day, days, seed, prefix):
+    rng = random.Random(seed)
+    for idx in range(count):
+        yield {"destination": rng.choice(cities), "ticket_class": rng.choice(CLASSES), "num_tickets": 1,
+               "date": (first_day + timedelta(days=rng.randrange(days))).isoformat(),
+               "email": f"{prefix}{idx}@example.com", "full_name": f"Customer {idx}"}
+
+
+def run_chat(assistant, scripts, concurrency):
+    turns = []
+
+    def converse(idx, script):
+        request = SimpleNamespace(session_hash=f"conversation-{idx}")
+        history = []
+        started = time.perf_counter()
+        for message in script:
+            turn_started = time.perf_counter()
+            reply = assistant.chat(message, history, request)
+            turns.append(time.perf_counter() - turn_started)
+            history.append((message, reply))
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        conversation_times = list(pool.map(converse, range(len(scripts)), scripts))
+    return turns, conversation_times, []
+
+
+def run_stream(assistant, scripts, concurrency):
+    turns, first_chunks = [], []
+
+    async def converse(idx, script, slots):
+        async with slots:
+            request = SimpleNamespace(session_hash=f"conversation-{idx}")
+            history = []
+            started = time.perf_counter()
+            for message in script:
+                turn_started = time.perf_counter()
+                reply = first_chunk = None
+                async for reply in assistant.chat_stream(message, history, request):
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter() - turn_started
+                first_chunks.append(first_chunk)
+                turns.append(time.perf_counter() - turn_started)
+                history.append((message, reply or ""))
+            return time.perf_counter() - started
+
+    async def main():
+        slots = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(converse(idx, script, slots) for idx, script in enumerate(scripts)))
+
+    conversation_times = asyncio.run(main())
+    # Let the background writer finish the last bookings before they are counted
+    assistant._booking_writer.submit(lambda: None).result()
+    return turns, conversation_times, first_chunks
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for section, metric, higher_is_better in GUARDED:
+        old = baseline.get(section, {}).get(metric)
+        new = results.get(section, {}).get(metric)
+        if not old or new is None:
+            continue
+        change = (old - new) / old if higher_is_better else (new - old) / old
+        regressed = change > tolerance and (higher_is_better or new - old >= MIN_DELTA_MS)
+        status = "REGRESSION" if regressed else "ok"
+        print(f"  {section + '.' + metric:<24} {old:10.2f} -> {new:10.2f}  "
+              f"{abs(change):6.1%} {'worse' if change > 0 else 'better'}  {status}")
+        if regressed:
+            regressions.append(f"{section}.{metric}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mode", choices=["chat", "stream"], default="chat")
+    parser.add_argument("--preload", type=int, default=10_000, help="bookings in the store before the run")
+    parser.add_argument("--bookings", type=int, default=2000, help="direct book_ticket calls timed")
+    parser.add_argument("--store", choices=["sqlite", "jsonl"], default="sqlite")
+    parser.add_argument("--first-token-delay", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--reply-tokens", type=int, default=40)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed fraction worse than the baseline")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # sold-out flights log a warning per refused booking
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bookings.db" if args.store == "sqlite" else "bookings.jsonl")
+        started = time.perf_counter()
+        booking_system = BookingSystem(store=open_store(path))
+        flight_db = booking_system.flight_db
+        cities = list(flight_db.flights)
+        first_day, days = flight_db.inventory.first_day, flight_db.horizon_days
+        for _ in booking_system.book_many(booking_requests(args.preload, cities, first_day, days, args.seed, "preload"),
+                                          chunk_size=5000):
+            pass
+        preload_seconds = time.perf_counter() - started
+
+        model = SimulatedModel(args.first_token_delay, args.tokens_per_second, args.reply_tokens,
+                               args.jitter, args.seed)
+        assistant = AirlineAssistant(model, booking_system, max_inflight=args.concurrency)
+        scripts = conversations(args.conversations, cities, first_day, days, args.seed)
+        stored_before = len(booking_system.store)
+        run = run_chat if args.mode == "chat" else run_stream
+        started = time.perf_counter()
+        turns, conversation_times, first_chunks = run(assistant, scripts, args.concurrency)
+        wall = time.perf_counter() - started
+        booked = len(booking_system.store) - stored_before
+
+        # Stage timings on their own, without the model
+        extract = []
+        for message in (message for script in scripts for message in script):
+            stage_started = time.perf_counter()
+            assistant.extract_booking_details(message)
+            extract.append(time.perf_counter() - stage_started)
+        book = []
+        for request in booking_requests(args.bookings, cities, first_day, days, args.seed + 1, "direct"):
+            stage_started = time.perf_counter()
+            booking_system.book_ticket(request["destination"], 1, request["ticket_class"], request["email"],
+                                       request["date"], request["full_name"])
+            book.append(time.perf_counter() - stage_started)
+
+        stats = assistant.fast_path.stats()
+        results = {
+            "config": {key: value for key, value in vars(args).items() if key not in ("json", "baseline")},
+            "chat_turn": percentiles(turns),
+            "first_chunk": percentiles(first_chunks),
+            "conversation": percentiles(conversation_times),
+            "extract": percentiles(extract),
+            "book_ticket": percentiles(book),
+            "throughput": {
+                "turns_per_s": round(len(turns) / wall, 2),
+                "conversations_per_s": round(len(scripts) / wall, 2),
+                "wall_s": round(wall, 3),
+            },
+            "memory": {"peak_rss_mib": peak_rss_mib(), "stored_bookings": len(booking_system.store)},
+            "model_calls": model.calls,
+            "fast_path_hit_rate": round(stats["hit_rate"], 4),
+            "conversations_booked": booked,
+            "preload_s": round(preload_seconds, 3),
+        }
+
+    for section in ("chat_turn", "first_chunk", "conversation", "extract", "book_ticket"):
+        figures = results[section]
+        if figures["count"]:
+            print(f"{section:<13} n={figures['count']:<6} p50 {figures['p50_ms']:9.3f} ms  "
+                  f"p95 {figures['p95_ms']:9.3f} ms  p99 {figures['p99_ms']:9.3f} ms")
+    throughput = results["throughput"]
+    print(f"throughput    {throughput['turns_per_s']:,.1f} turns/s  {throughput['conversations_per_s']:,.1f} "
+          f"conversations/s  ({args.mode}, concurrency {args.concurrency})")
+    print(f"model calls   {model.calls} for {len(turns)} turns (fast path {results['fast_path_hit_rate']:.1%}), "
+          f"{booked} of {len(scripts)} conversations booked, peak RSS {results['memory']['peak_rss_mib']} MiB")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"against {args.baseline} (tolerance {args.tolerance:.0%}):")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
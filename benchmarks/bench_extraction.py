@@ -0,0 +1,133 @@
+"""Microbenchmark for booking-detail extraction.
+
+Checks that BookingExtractor (single message and batch) produces exactly the
+booking state of the original regex loop on a corpus of sample messages, then
+times all three:
+
+    python -m benchmarks.bench_extraction --messages 20000
+"""
+import argparse
+import itertools
+import logging
+import os
+import random
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from assistant import AirlineAssistant
+from booking import BookingSystem
+from booking_store import open_store
+from extraction import BookingExtractor
+from llm import FakeModel
+
+
+def legacy_extract(flight_db, message, booking):
+    """The extractor as it was before BookingExtractor, kept verbatim for comparison."""
+    emails = re.findall(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', message)
+    if emails:
+        booking["email"] = emails[0]
+    phones = re.findall(r'\b\d{10}\b', message)
+    if phones:
+        booking["phone"] = phones[0]
+    passports = re.findall(r'\b[A-Z0-9]{6,9}\b', message.upper())
+    if passports:
+        booking["passport"] = passports[0]
+    dates = re.findall(r'\d{4}-\d{2}-\d{2}', message)
+    if dates:
+        is_valid, _ = flight_db.is_valid_date(dates[0])
+        if is_valid:
+            booking["date"] = dates[0]
+    num_matches = re.findall(r'\b(\d+)\s+(?:ticket|tickets|seat|seats)\b', message.lower())
+    if num_matches:
+        booking["num_tickets"] = int(num_matches[0])
+    for city in flight_db.flights.keys():
+        if city.lower() in message.lower():
+            booking["destination"] = city
+            break
+    for ticket_class in ["economy", "business", "first"]:
+        if ticket_class in message.lower():
+            booking["ticket_class"] = ticket_class
+            break
+    for location in flight_db.seat_preferences["location"]:
+        if location in message.lower():
+            booking.setdefault("seat_preferences", {})["location"] = location
+            break
+    for meal_type in flight_db.meal_options["regular"] + flight_db.meal_options["special"]:
+        if meal_type in message.lower():
+            booking.setdefault("meal_preferences", []).append(meal_type)
+    return booking
+
+
+def sample_corpus(flight_db, size, seed=0):
+    rng = random.Random(seed)
+    soon = (datetime.now() + timedelta(days=5)).strftime('%Y-%m-%d')
+    past = (datetime.now() - timedelta(days=5)).strftime('%Y-%m-%d')
+    meals = flight_db.meal_options["regular"] + flight_db.meal_options["special"]
+    fragments = [
+        *(f"fly to {city.title()}" for city in flight_db.flights),
+        "economy please", "Business Class", "FIRST class to", "first of all",
+        "window seat", "an AISLE seat", "middle seat is fine",
+        *(f"{meal} meal" for meal in meals), "Non-Vegetarian food",
+        "my email is jane.doe+trip@example.co.uk", "contact J.Smith@Mail.com",
+        "call 9876543210", "phone 12345", "passport ab12345", "passport X1234567Z",
+        f"on {soon}", f"on {past}", "on 2025-13-45",
+        "2 tickets", "3 Seats", "1 ticket", "10 seats for the team",
+        "hello", "what's the price?", "Straße nach München",
+    ]
+    return [" ".join(rng.sample(fragments, rng.randint(1, 6))) for _ in range(size)]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # keep booking system log lines out of the timing output
+
+    with tempfile.TemporaryDirectory() as tmp:
+        assistant = AirlineAssistant(model=FakeModel(), booking_system=BookingSystem(store=open_store(os.path.join(tmp, "b.db"))))
+    flight_db = assistant.booking_system.flight_db
+    corpus = sample_corpus(flight_db, args.messages)
+
+    legacy, legacy_time = timed(lambda: [legacy_extract(flight_db, m, {}) for m in corpus])
+    single, single_time = timed(lambda: [assistant.extract_booking_details(m, {}) for m in corpus])
+    batch, batch_time = timed(lambda: assistant.extract_many(corpus))
+
+    mismatches = [(m, l, s) for m, l, s in zip(corpus, legacy, single) if l != s]
+    mismatches += [(m, l, b) for m, l, b in zip(corpus, legacy, batch) if l != b]
+    assert not mismatches, f"{len(mismatches)} mismatches, first: {mismatches[0]}"
+
+    # Multi-turn state must accumulate identically too (meal lists keep appending)
+    legacy_state, new_state = {}, {}
+    for message in itertools.islice(corpus, 500):
+        legacy_extract(flight_db, message, legacy_state)
+        assistant.extract_booking_details(message, new_state)
+    assert legacy_state == new_state
+
+    print(f"{len(corpus)} messages, outputs identical")
+    for label, elapsed in (("legacy loop", legacy_time), ("extract", single_time), ("extract_many", batch_time)):
+        print(f"{label:<14} {elapsed / len(corpus) * 1e6:7.2f} us/message  ({legacy_time / elapsed:.2f}x)")
+
+    # Keyword scan cost as the city vocabulary grows (e.g. a multi-route catalog)
+    sample = [m.lower() for m in corpus[:2000]]
+    print(f"{'cities':>8} {'substring loop':>15} {'combined regex':>15}")
+    for num_cities in (5, 100, 1000):
+        cities = list(flight_db.flights) + [f"city{i:04d}ville" for i in range(num_cities - len(flight_db.flights))]
+        extractor = BookingExtractor(cities, ["economy", "business", "first"],
+                                     flight_db.seat_preferences["location"],
+                                     flight_db.meal_options["regular"] + flight_db.meal_options["special"])
+        vocabulary = extractor.cities + extractor.classes + extractor.seat_locations + extractor.meal_types
+        _, loop_time = timed(lambda: [[k for k in vocabulary if k in m] for m in sample])
+        _, regex_time = timed(lambda: [extractor._keyword_pattern.findall(m) for m in sample])
+        print(f"{num_cities:>8} {loop_time / len(sample) * 1e6:12.2f} us {regex_time / len(sample) * 1e6:12.2f} us")
+
+
+if __name__ == "__main__":
+    main()
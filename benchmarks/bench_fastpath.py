@@ -0,0 +1,88 @@
+"""Hit-rate and latency benchmark for the flight-info fast path.
+
+Replays a mix of lookup questions, repeated general questions and booking
+messages through ``chat`` with llm.FakeModel (no network), with and without
+the fast path:
+
+    python -m benchmarks.bench_fastpath --chats 300 --first-token-delay 0.2
+"""
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+
+from assistant import AirlineAssistant
+from booking import BookingSystem
+from booking_store import open_store
+from llm import FakeModel
+
+QUESTIONS = [
+    "What's the price for a business class ticket to Tokyo?",
+    "How long is the flight to London?",
+    "Which airline flies to Berlin?",
+    "How much baggage do I get in first class to Paris?",
+    "What dates are available for economy to Mumbai?",
+    "Which is the cheapest fare to Paris?",
+    "What destinations do you fly to?",
+    "Do you allow pets in the cabin?",
+    "Can I bring a stroller?",
+    "I want to book a flight to London.",
+]
+
+
+class NoFastPath:
+    """Sends every turn to the model, as chat did before the fast path."""
+
+    def answer(self, message, fields, booking, history, fresh_session):
+        return None
+
+    def remember(self, message, fields, history, fresh_session, reply, model_seconds):
+        pass
+
+
+def run(assistant, chats):
+    latencies = []
+    for idx in range(chats):
+        message = QUESTIONS[idx % len(QUESTIONS)]
+        started = time.perf_counter()
+        assistant.chat(message, [], SimpleNamespace(session_hash=f"chat-{idx}"))
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def summarize(label, latencies, model_calls):
+    print(f"{label:<16} p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+          f"mean {statistics.fmean(latencies) * 1000:7.1f} ms  "
+          f"total {sum(latencies):6.2f} s  model calls {model_calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=300)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # sold-out flights log a warning per refused booking
+
+    with tempfile.TemporaryDirectory() as tmp:
+        booking_system = BookingSystem(store=open_store(os.path.join(tmp, "bookings.db")))
+        results = []
+        for label, fast_path in [("model only", NoFastPath()), ("fast path", None)]:
+            model = FakeModel(first_token_delay=args.first_token_delay, token_delay=args.token_delay)
+            assistant = AirlineAssistant(model, booking_system, fast_path=fast_path)
+            latencies = run(assistant, args.chats)
+            results.append((label, latencies, model.calls, assistant.fast_path))
+
+    for label, latencies, model_calls, _ in results:
+        summarize(label, latencies, model_calls)
+    stats = results[-1][3].stats()
+    print(f"hit rate {stats['hit_rate']:.1%} ({stats['database_hits']} database, {stats['cache_hits']} cache, "
+          f"{stats['misses']} model)  model time saved ~{stats['model_seconds_saved']:.2f} s  "
+          f"cached answers {stats['cache_entries']}")
+
+
+if __name__ == "__main__":
+    main()
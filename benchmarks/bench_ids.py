@@ -0,0 +1,68 @@
+"""Multi-process stress test for BookingIdGenerator.
+
+Every process gets its own node ID and generates IDs as fast as it can, in
+batches (``next_ids``) or one at a time (``next_id``); all IDs are then
+checked for duplicates and per-process ordering:
+
+    python -m benchmarks.bench_ids --processes 1 4 8 --ids 2000000
+"""
+import argparse
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from ids import BookingIdGenerator, encode, scramble
+
+
+def generate(job):
+    node_id, count, batch = job
+    generator = BookingIdGenerator(node_id=node_id)
+    if batch > 1:
+        ids = []
+        for start in range(0, count, batch):
+            ids.extend(generator.next_ids(min(batch, count - start)))
+    else:
+        ids = [generator.next_id() for _ in range(count)]
+    return np.array(ids, dtype=np.int64).tobytes()
+
+
+def run(processes, ids_per_process, batch):
+    jobs = [(node_id, ids_per_process, batch) for node_id in range(processes)]
+    with Pool(processes) as pool:
+        started = time.perf_counter()
+        results = pool.map(generate, jobs)
+        wall = time.perf_counter() - started
+    arrays = [np.frombuffer(raw, dtype=np.int64) for raw in results]
+    for array in arrays:
+        assert (np.diff(array) > 0).all(), "IDs from one generator are not strictly increasing"
+    all_ids = np.concatenate(arrays)
+    duplicates = len(all_ids) - len(np.unique(all_ids))
+    return len(all_ids), duplicates, len(all_ids) / wall, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--ids", type=int, default=2_000_000, help="IDs per process")
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 4096], help="IDs per next_ids call")
+    args = parser.parse_args()
+
+    for processes in args.processes:
+        for batch in args.batch:
+            total, duplicates, rate, wall = run(processes, args.ids, batch)
+            print(f"{processes:>2} processes  batch {batch:>5}  {total:>10,} IDs  "
+                  f"{rate / 1e6:6.2f} M IDs/s  wall {wall:5.2f} s  duplicates {duplicates}")
+
+    # Text formatting dominates once IDs become booking IDs and confirmation codes
+    generator = BookingIdGenerator(node_id=0)
+    values = generator.next_ids(200_000)
+    started = time.perf_counter()
+    codes = {encode(scramble(value)) for value in values}
+    elapsed = time.perf_counter() - started
+    assert len(codes) == len(values), "confirmation code collision"
+    print(f"confirmation codes: {len(values) / elapsed / 1e6:.2f} M/s, no collisions in {len(values):,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Multi-threaded stress benchmark for SeatInventory.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_inventory --threads 1 2 4 8 --flights 1 10 100
+
+Every run checks that no flight was oversold and that the seats handed out
+match the seats taken from the inventory.
+"""
+import argparse
+import random
+import threading
+import time
+from datetime import date, timedelta
+
+from inventory import SeatInventory
+
+CLASSES = ("economy", "business", "first")
+CAPACITY = {"economy": 100, "business": 20, "first": 10}
+
+
+def build_inventory(num_flights, num_days):
+    routes = [f"city{flight}" for flight in range(num_flights)]
+    today = date.today()
+    days = [today + timedelta(days=offset) for offset in range(num_days)]
+    inventory = SeatInventory(routes, CLASSES, CAPACITY, horizon_days=num_days, start_day=today)
+    keys = [(route, day, ticket_class) for route in routes for day in days for ticket_class in CLASSES]
+    return inventory, keys
+
+
+def run(num_threads, num_flights, ops_per_thread, num_days=30, seed=0):
+    inventory, keys = build_inventory(num_flights, num_days)
+    initial = inventory.snapshot()
+    taken = [0] * num_threads
+    start_barrier = threading.Barrier(num_threads + 1)
+
+    def worker(idx):
+        rng = random.Random(seed + idx)
+        held = []
+        start_barrier.wait()
+        for _ in range(ops_per_thread):
+            if held and rng.random() < 0.2:
+                key, n = held.pop()
+                inventory.release(*key, n)
+                taken[idx] -= n
+                continue
+            key = rng.choice(keys)
+            n = rng.randint(1, 3)
+            if inventory.reserve(*key, n):
+                held.append((key, n))
+                taken[idx] += n
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(num_threads)]
+    for t in threads:
+        t.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    final = inventory.snapshot()
+    oversold = [key for key, seats in final.items() if seats < 0]
+    handed_out = sum(initial.values()) - sum(final.values())
+    assert not oversold, f"oversold flights: {oversold[:5]}"
+    assert handed_out == sum(taken), f"seat leak: inventory says {handed_out}, workers hold {sum(taken)}"
+    return num_threads * ops_per_thread / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--flights", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--ops", type=int, default=50_000, help="operations per thread")
+    args = parser.parse_args()
+
+    print(f"{'flights':>8} {'threads':>8} {'ops/s':>12} {'scaling':>8}")
+    for num_flights in args.flights:
+        baseline = None
+        for num_threads in args.threads:
+            throughput = run(num_threads, num_flights, args.ops)
+            baseline = baseline or throughput / num_threads
+            scaling = throughput / baseline
+            print(f"{num_flights:>8} {num_threads:>8} {throughput:>12,.0f} {scaling:>7.2f}x")
+    print("no overselling detected")
+
+
+if __name__ == "__main__":
+    main()
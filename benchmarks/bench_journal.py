@@ -0,0 +1,183 @@
+"""Booking journal benchmark: group-commit throughput, recovery time and a kill-mid-write crash test.
+
+Measures durable (fsynced) inserts per second for the JSONL journal by
+number of concurrent writers, group-commit delay and insert_many batch size,
+and the time to replay a journal before and after compaction. The crash test
+repeatedly SIGKILLs a child process that is writing and compacting, tears
+the journal's last line, and checks that every booking the child had been
+told was saved is still there:
+
+    python -m benchmarks.bench_journal --writers 1 8 32 --crash-rounds 20
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from booking_store import LogBookingStore
+
+
+def booking(key):
+    return {"booking_id": f"BK-{key}", "confirmation_code": f"C-{key}", "email": f"{key}@example.com",
+            "destination": "paris", "date": "2026-01-01", "num_tickets": 1, "ticket_class": "economy"}
+
+
+def run_writers(path, writers, per_writer, **options):
+    store = LogBookingStore(path, **options)
+    latencies = []
+
+    def write(worker):
+        for idx in range(per_writer):
+            started = time.perf_counter()
+            store.insert(booking(f"{worker}-{idx}"))
+            latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=write, args=(worker,)) for worker in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    store.close()
+    latencies.sort()
+    return len(latencies) / elapsed, len(latencies) / max(store.syncs, 1), latencies[int(len(latencies) * 0.99)]
+
+
+def child(path, prefix):
+    """Write bookings and updates on several threads, printing an ack once each call returns."""
+    store = LogBookingStore(path, compact_every=3000)
+    out = threading.Lock()
+
+    def write(worker):
+        for idx in range(10**9):
+            key = f"{prefix}-{worker}-{idx}"
+            store.insert(booking(key))
+            with out:
+                print(f"insert BK-{key}", flush=True)
+            if idx % 5 == 4:
+                # Updates carry an increasing counter so the check can tell old values from new ones
+                email = f"{prefix}-{worker}-{idx - 4}@example.com"
+                store.update_by_email(email, {"num_tickets": idx})
+                with out:
+                    print(f"update {email} {idx}", flush=True)
+
+    for worker in range(8):
+        threading.Thread(target=write, args=(worker,), daemon=True).start()
+    threading.Event().wait()
+
+
+def crash_test(rounds, seed):
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bookings.jsonl")
+        acked_inserts, acked_updates = set(), {}
+        for round_idx in range(rounds):
+            process = subprocess.Popen([sys.executable, "-m", "benchmarks.bench_journal", "--child", path,
+                                        "--prefix", f"r{round_idx}"], stdout=subprocess.PIPE, text=True)
+            acks = []
+            reader = threading.Thread(target=lambda: acks.extend(process.stdout), daemon=True)
+            reader.start()
+            time.sleep(rng.uniform(0.5, 2.0))
+            process.kill()
+            process.wait()
+            reader.join()
+            for line in acks:
+                if not line.endswith("\n"):
+                    continue  # cut off by the kill before the ack was complete
+                kind, key, *value = line.split()
+                if kind == "insert":
+                    acked_inserts.add(key)
+                else:
+                    acked_updates[key] = max(acked_updates.get(key, 0), int(value[0]))
+            if rng.random() < 0.5:
+                # Tear the last line as a crash in the middle of write() would
+                with open(path, "a", encoding="utf-8") as f:
+                    f.write('{"op": "insert", "row": {"booking_id": "BK-torn", "ema')
+
+            started = time.perf_counter()
+            store = LogBookingStore(path, compact_every=10**9)
+            recovery = time.perf_counter() - started
+            lost = [booking_id for booking_id in acked_inserts if store.get(booking_id) is None]
+            stale = [email for email, value in acked_updates.items()
+                     if (store.find_by_email(email) or {}).get("num_tickets", -1) < value]
+            with open(path, encoding="utf-8") as f:
+                snapshots = sum(line.startswith('{"op": "snapshot"') for line in f)
+            print(f"round {round_idx + 1:2d}: {len(acked_inserts):7,} acked bookings, {len(store):7,} on disk, "
+                  f"{snapshots} snapshot blocks, recovered in {recovery * 1000:6.1f} ms, "
+                  f"lost {len(lost)}, stale updates {len(stale)}")
+            store.close()
+            assert not lost and not stale, f"acknowledged writes lost: {lost[:5]} {stale[:5]}"
+    print(f"no acknowledged booking or update lost in {rounds} kills")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--commit-delays-ms", type=float, nargs="+", default=[0, 1, 5])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--inserts", type=int, default=4000, help="inserts per configuration")
+    parser.add_argument("--recovery-rows", type=int, default=200_000)
+    parser.add_argument("--crash-rounds", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--prefix", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.prefix)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bookings.jsonl")
+        for writers in args.writers:
+            for delay in args.commit_delays_ms:
+                if os.path.exists(path):
+                    os.remove(path)
+                rate, per_sync, p99 = run_writers(path, writers, max(1, args.inserts // writers),
+                                                  commit_delay=delay / 1000)
+                print(f"{writers:3d} writers  commit delay {delay:4.1f} ms  {rate:9,.0f} durable inserts/s  "
+                      f"{per_sync:6.1f} per fsync  p99 {p99 * 1000:6.2f} ms")
+            os.remove(path)
+            rate, _, p99 = run_writers(path, writers, max(1, args.inserts // writers), sync=False)
+            print(f"{writers:3d} writers  no fsync             {rate:9,.0f} inserts/s          "
+                  f"             p99 {p99 * 1000:6.2f} ms")
+
+        for batch in args.batch_sizes:
+            os.remove(path)
+            store = LogBookingStore(path)
+            started = time.perf_counter()
+            for start in range(0, args.inserts, batch):
+                store.insert_many(booking(f"b-{idx}") for idx in range(start, min(start + batch, args.inserts)))
+            elapsed = time.perf_counter() - started
+            print(f"insert_many batch {batch:5d}  {args.inserts / elapsed:9,.0f} durable inserts/s  "
+                  f"{store.syncs} fsyncs")
+            store.close()
+
+        os.remove(path)
+        store = LogBookingStore(path, sync=False, compact_every=10**9)
+        store.insert_many(booking(idx) for idx in range(args.recovery_rows))
+        for idx in range(0, args.recovery_rows, 4):
+            store.update_by_email(f"{idx}@example.com", {"num_tickets": 2})
+        store.close()
+        size = os.path.getsize(path)
+        started = time.perf_counter()
+        store = LogBookingStore(path, compact_every=10**9)
+        replay = time.perf_counter() - started
+        store.compact()
+        store.close()
+        started = time.perf_counter()
+        LogBookingStore(path).close()
+        compacted = time.perf_counter() - started
+        print(f"recovery {args.recovery_rows:,} rows  journal {size / 2**20:6.1f} MiB in {replay:5.2f} s  "
+              f"compacted {os.path.getsize(path) / 2**20:6.1f} MiB in {compacted:5.2f} s")
+
+    if args.crash_rounds:
+        crash_test(args.crash_rounds, args.seed)
+
+
+if __name__ == "__main__":
+    main()
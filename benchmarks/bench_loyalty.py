@@ -0,0 +1,80 @@
+"""Loyalty ledger benchmark: balance lookups, batch earning, expiry runs and replay.
+
+Compares an O(1) ledger balance lookup with summing a customer's points by
+scanning booking history, then expires a year of lots across all customers:
+
+    python -m benchmarks.bench_loyalty --customers 100000 --earnings 500000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from loyalty import LoyaltyLedger
+
+
+class Clock:
+    def __init__(self, today):
+        self.today = today
+
+    def __call__(self):
+        return self.today
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--customers", type=int, default=100_000)
+    parser.add_argument("--earnings", type=int, default=500_000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    emails = [f"customer{idx}@example.com" for idx in range(args.customers)]
+    history = [(rng.choice(emails), rng.randint(50, 500), f"BK-{idx}") for idx in range(args.earnings)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "loyalty.jsonl")
+        clock = Clock(date.today() - timedelta(days=400))
+        ledger = LoyaltyLedger(path, expiry_days=365, clock=clock)
+        started = time.perf_counter()
+        # Spread earnings over 60 days so the expiry run below has several days of lots to clear
+        day_size = len(history) // 60 + 1
+        for start in range(0, len(history), day_size):
+            ledger.earn_many(history[start:start + day_size])
+            clock.today += timedelta(days=1)
+        earn_time = time.perf_counter() - started
+        print(f"earn_many   {args.earnings:,} earnings in {earn_time:6.2f} s  ({args.earnings / earn_time:,.0f}/s)")
+
+        sample = rng.sample(emails, args.lookups)
+        started = time.perf_counter()
+        ledger_balances = [ledger.balance(email) for email in sample]
+        lookup_time = (time.perf_counter() - started) / args.lookups
+        scan_sample = sample[:20]
+        started = time.perf_counter()
+        scanned = [sum(points for email, points, _ in history if email == customer) for customer in scan_sample]
+        scan_time = (time.perf_counter() - started) / len(scan_sample)
+        assert scanned == ledger_balances[:len(scan_sample)], "ledger balance differs from booking history"
+        print(f"balance     ledger {lookup_time * 1e6:8.2f} us   history scan {scan_time * 1e6:12.1f} us")
+
+        for email in sample[:100]:
+            ledger.redeem(email, ledger.balance(email) // 2)
+
+        before = sum(ledger.balances().values())
+        started = time.perf_counter()
+        expired = ledger.expire(as_of=clock.today + timedelta(days=330))
+        expire_time = time.perf_counter() - started
+        print(f"expire      {len(expired):,} customers, {sum(expired.values()):,} points in {expire_time:6.2f} s  "
+              f"(balance {before:,} -> {sum(ledger.balances().values()):,})")
+        ledger.close()
+
+        started = time.perf_counter()
+        replayed = LoyaltyLedger(path, clock=clock)
+        replay_time = time.perf_counter() - started
+        assert replayed.balances() == ledger.balances(), "replayed balances differ"
+        print(f"replay      {replayed.transactions:,} transactions in {replay_time:6.2f} s, balances match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Prompt size and build time over long synthetic conversations.
+
+Compares the unbounded prompt (full system prompt, indented booking JSON and
+every past turn) with ContextBuilder's bounded window:
+
+    python -m benchmarks.bench_prompt --turns 200 --keep-turns 6 --max-tokens 4000
+"""
+import argparse
+import json
+import random
+import time
+
+from prompt import ContextBuilder, estimate_tokens
+
+SYSTEM_MESSAGE = "### Role\nYou are a helpful and efficient flight booking assistant. " * 50  # ~3 KB, like app.py's
+
+
+def unbounded_messages(message, history, booking, conversation_state):
+    messages = [SYSTEM_MESSAGE, f"""Current booking details: {json.dumps(booking, indent=2)}
+        Conversation state: {conversation_state}
+        """]
+    for human, assistant in history:
+        messages.append(human)
+        messages.append(assistant)
+    messages.append(message)
+    return messages
+
+
+def synthetic_turn(rng, idx):
+    human = rng.choice([
+        "Can you check economy seats to London next week?",
+        "My email is traveller@example.com and phone 5551234567",
+        "Actually make it business class, 2 tickets please",
+        "I'd like a window seat and a vegetarian meal",
+        "What is the baggage allowance for that flight?",
+    ])
+    assistant = f"Turn {idx}: " + "Certainly, here are the details for your booking request. " * rng.randint(2, 8)
+    return human, assistant
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--keep-turns", type=int, default=6)
+    parser.add_argument("--max-tokens", type=int, default=4000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    builder = ContextBuilder(SYSTEM_MESSAGE, max_tokens=args.max_tokens, keep_turns=args.keep_turns)
+    booking = {"email": "traveller@example.com", "destination": "london", "ticket_class": "business",
+               "num_tickets": 2, "seat_preferences": {"location": "window"}, "meal_preferences": ["vegetarian"]}
+    history = []
+    unbounded_tokens = bounded_tokens = 0
+    unbounded_time = bounded_time = 0.0
+
+    print(f"{'turn':>6} {'unbounded tok':>14} {'bounded tok':>12}")
+    for idx in range(1, args.turns + 1):
+        human, assistant = synthetic_turn(rng, idx)
+
+        started = time.perf_counter()
+        messages = unbounded_messages(human, history, booking, "initial")
+        unbounded_time += time.perf_counter() - started
+        turn_unbounded = sum(estimate_tokens(m) for m in messages)
+
+        started = time.perf_counter()
+        _, turn_bounded, _ = builder.build(human, history, booking, "initial")
+        bounded_time += time.perf_counter() - started
+
+        unbounded_tokens += turn_unbounded
+        bounded_tokens += turn_bounded
+        if idx in (1, 10, 50) or idx % 100 == 0 or idx == args.turns:
+            print(f"{idx:>6} {turn_unbounded:>14,} {turn_bounded:>12,}")
+        history.append((human, assistant))
+
+    print(f"total prompt tokens: unbounded {unbounded_tokens:,}  bounded {bounded_tokens:,} "
+          f"({100 * (1 - bounded_tokens / unbounded_tokens):.1f}% fewer)")
+    print(f"build time per turn: unbounded {unbounded_time / args.turns * 1e6:.1f} us  "
+          f"bounded {bounded_time / args.turns * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Incremental vs. batch booking report benchmark.
+
+Builds a BookingReport from synthetic historical rows both one booking at a
+time (``add``) and in columnar chunks (``add_many``), and checks that both
+give identical aggregates. It then books through BookingSystem, including
+updates, and checks the live report against a backfill from the store:
+
+    python -m benchmarks.bench_reporting --rows 1000000
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from booking import BookingSystem
+from booking_store import open_store
+from reporting import BookingReport
+
+DESTINATIONS = ["london", "paris", "tokyo", "berlin", "mumbai"]
+CLASSES = {"economy": 799, "business": 2399, "first": 4999}
+MEALS = [[], [], [], ["vegetarian"], ["vegan", "gluten-free"], {"halal": True}]
+MEDICAL = [[], [], [], [], ["wheelchair"], ["oxygen", "wheelchair"]]
+CAPACITY = {"economy": 100, "business": 20, "first": 10}
+
+
+def generate_rows(rows, seed=0):
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    meals = [json.dumps(m) for m in MEALS]
+    medical = [json.dumps(m) for m in MEDICAL]
+    for idx in range(rows):
+        ticket_class = rng.choice(list(CLASSES))
+        num_tickets = rng.randint(1, 4)
+        total_price = num_tickets * CLASSES[ticket_class]
+        yield {
+            "email": f"customer{rng.randrange(rows // 3 + 1)}@example.com",
+            "destination": rng.choice(DESTINATIONS),
+            "date": (start + timedelta(days=rng.randrange(730))).isoformat(),
+            "ticket_class": ticket_class,
+            "num_tickets": num_tickets,
+            "total_price": total_price,
+            "loyalty_points": int(total_price * 0.1),
+            "meal_preferences": rng.choice(meals),
+            "medical_assistance": rng.choice(medical),
+        }
+
+
+def check_live_report(requests):
+    """Book (and re-book) through BookingSystem and compare its report with a backfill of the store."""
+    with tempfile.TemporaryDirectory() as tmp:
+        booking_system = BookingSystem(store=open_store(os.path.join(tmp, "bookings.db")))
+        today = date.today()
+        rng = random.Random(1)
+        batch = [{
+            "email": f"live{idx}@example.com", "full_name": "Live Test",
+            "destination": rng.choice(DESTINATIONS), "ticket_class": rng.choice(list(CLASSES)),
+            "date": (today + timedelta(days=rng.randrange(1, 30))).isoformat(), "num_tickets": rng.randint(1, 3),
+            "meal_preferences": rng.choice(MEALS), "medical_assistance": rng.choice(MEDICAL),
+        } for idx in range(requests)]
+        list(booking_system.book_many(batch))
+        for request in batch[::5]:
+            booking_system.book_ticket(request["destination"], 1, "economy", request["email"],
+                                       request["date"], request["full_name"], meal_prefs=["kosher"])
+        backfill = BookingReport(booking_system.flight_db.seat_capacity)
+        backfill.add_many(booking_system.store.rows())
+        live, rebuilt = booking_system.report.snapshot(), backfill.snapshot()
+    return live == rebuilt, len(live["revenue"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--live-requests", type=int, default=2000)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # sold-out flights log a warning per refused booking
+
+    rows = list(generate_rows(args.rows))
+
+    incremental = BookingReport(CAPACITY)
+    started = time.perf_counter()
+    for row in rows:
+        incremental.add(row)
+    incremental_time = time.perf_counter() - started
+
+    batch = BookingReport(CAPACITY)
+    started = time.perf_counter()
+    batch.add_many(iter(rows), chunk_size=args.chunk_size)
+    batch_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    snapshot = batch.snapshot()
+    read_time = time.perf_counter() - started
+    identical = snapshot == incremental.snapshot()
+
+    print(f"rows {args.rows:,}  flights {len(snapshot['revenue']):,}  customers {len(snapshot['loyalty_points']):,}")
+    print(f"add (per booking)   {incremental_time:7.2f} s  {args.rows / incremental_time:10,.0f} rows/s")
+    print(f"add_many (columnar) {batch_time:7.2f} s  {args.rows / batch_time:10,.0f} rows/s")
+    print(f"full snapshot read  {read_time * 1000:7.1f} ms")
+    print(f"identical aggregates: {identical}")
+
+    live_identical, flights = check_live_report(args.live_requests)
+    print(f"live report matches store backfill ({flights} flights): {live_identical}")
+    if not (identical and live_identical):
+        raise SystemExit("reports differ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Seat assignment benchmark: latency, fill rate and party adjacency.
+
+Fills the economy cabins of many flights (routes x days) with random parties
+and seat preferences until they are full:
+
+    python -m benchmarks.bench_seatmap --routes 200 --days 365 --requests 500000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+from seatmap import DEFAULT_SEAT_CONFIG, SeatMap
+
+LOCATIONS = [None, None, "window", "aisle", "middle"]
+SECTIONS = [None, None, None, "front", "back"]
+
+
+def seated_together(labels):
+    rows = {label[:-1] for label in labels}
+    return len(rows) == 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--routes", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--requests", type=int, default=300_000)
+    parser.add_argument("--flights-filled", type=int, default=200, help="flights filled to capacity for fill rate")
+    args = parser.parse_args()
+
+    flights = {f"route{idx}": {"seat_config": DEFAULT_SEAT_CONFIG} for idx in range(args.routes)}
+    rng = random.Random(0)
+    today = date.today()
+
+    seat_map = SeatMap.from_flights(flights)
+    layout = seat_map.layouts["route0", "economy"]
+    routes = list(flights)
+    latencies = []
+    together = parties = preferred = singles_with_prefs = 0
+    for _ in range(args.requests):
+        route = rng.choice(routes)
+        day = today + timedelta(days=rng.randrange(args.days))
+        party = rng.choice([1, 1, 1, 2, 2, 3, 4, 6])
+        preferences = {"location": rng.choice(LOCATIONS), "section": rng.choice(SECTIONS)}
+        started = time.perf_counter()
+        labels = seat_map.assign(route, day, "economy", party, preferences)
+        latencies.append(time.perf_counter() - started)
+        if party > 1 and labels:
+            parties += 1
+            together += seated_together(labels)
+        elif labels and (preferences["location"] or preferences["section"]):
+            singles_with_prefs += 1
+            preferred += bool(layout.bits(labels) & layout.mask(preferences))
+    memory = sys.getsizeof(seat_map._free) + sum(sys.getsizeof(key) + sys.getsizeof(free)
+                                                 for key, free in seat_map._free.items())
+
+    # Fill whole flights to see how many seats can be sold before assignment fails
+    filled = []
+    fill_latencies = []
+    fill_together = fill_parties = 0
+    for idx in range(args.flights_filled):
+        day = today + timedelta(days=idx)
+        fill_map = SeatMap.from_flights({"fill": {}})
+        sold = 0
+        misses = 0
+        while misses < 20:
+            party = rng.choice([1, 1, 1, 2, 2, 3, 4, 6])
+            started = time.perf_counter()
+            labels = fill_map.assign("fill", day, "economy", party, {"location": rng.choice(LOCATIONS)})
+            fill_latencies.append(time.perf_counter() - started)
+            if labels:
+                sold += len(labels)
+                if party > 1:
+                    fill_parties += 1
+                    fill_together += seated_together(labels)
+            else:
+                misses += 1
+        filled.append(sold / len(fill_map.layouts["fill", "economy"]))
+
+    latencies.sort()
+    print(f"flights held   {len(seat_map):,} of {args.routes * args.days:,}  "
+          f"({layout.all_seats.bit_length()} seats each), seat maps {memory / 2**20:.1f} MiB")
+    print(f"assign latency p50 {statistics.median(latencies) * 1e6:6.1f} us  "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:6.1f} us  "
+          f"{len(latencies) / sum(latencies):,.0f} assignments/s")
+    print(f"parties in one row {together / max(parties, 1):.1%}   "
+          f"singles matching preferences {preferred / max(singles_with_prefs, 1):.1%}")
+    print(f"fill rate when full {statistics.fmean(filled):.1%} (min {min(filled):.1%}), "
+          f"parties in one row {fill_together / max(fill_parties, 1):.1%}, "
+          f"assign latency while filling p50 {statistics.median(fill_latencies) * 1e6:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
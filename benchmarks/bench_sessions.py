@@ -0,0 +1,93 @@
+"""Load test for per-session chat state.
+
+Simulates N parallel chat sessions through AirlineAssistant.chat with a stub
+model (no network) and reports per-turn latency and resident memory:
+
+    python -m benchmarks.bench_sessions --sessions 2000 --concurrency 32
+"""
+import argparse
+import logging
+import os
+import resource
+import statistics
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from assistant import AirlineAssistant
+from booking import BookingSystem
+from booking_store import open_store
+
+
+class StubModel:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def generate_content(self, messages):
+        if self.latency:
+            time.sleep(self.latency)
+        return SimpleNamespace(text="Sure, I can help with that booking.")
+
+
+def conversation(idx):
+    date_str = (datetime.now() + timedelta(days=7)).strftime('%Y-%m-%d')
+    return [
+        "I want to fly to London in economy",
+        f"My email is user{idx}@example.com and my phone is {5550000000 + idx}",
+        f"2 tickets on {date_str} please",
+        "A window seat and a vegetarian meal",
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--model-latency", type=float, default=0.0, help="stub model delay in seconds")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)  # sold-out flights log a warning per refused booking
+
+    with tempfile.TemporaryDirectory() as tmp:
+        booking_system = BookingSystem(store=open_store(os.path.join(tmp, "bookings.db")))
+        assistant = AirlineAssistant(model=StubModel(args.model_latency), booking_system=booking_system)
+        assistant.sessions.max_sessions = max(assistant.sessions.max_sessions, args.sessions)
+
+        def run_session(idx):
+            request = SimpleNamespace(session_hash=f"session-{idx}")
+            history = []
+            latencies = []
+            for message in conversation(idx):
+                started = time.perf_counter()
+                reply = assistant.chat(message, history, request)
+                latencies.append(time.perf_counter() - started)
+                history.append((message, reply))
+            return latencies
+
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(run_session, range(args.sessions)))
+        elapsed = time.perf_counter() - started
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # Every session must have kept its own booking
+        for idx in range(args.sessions):
+            booking = assistant.sessions.get(f"session-{idx}").current_booking
+            assert booking["email"] == f"user{idx}@example.com", f"session {idx} saw {booking['email']}"
+
+        latencies = sorted(l for session in results for l in session)
+        p50, p95, p99 = (statistics.quantiles(latencies, n=100)[q - 1] for q in (50, 95, 99))
+        print(f"sessions held:      {len(assistant.sessions)}")
+        print(f"turns:              {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:,.0f}/s)")
+        print(f"turn latency (ms):  p50 {p50 * 1000:.2f}  p95 {p95 * 1000:.2f}  p99 {p99 * 1000:.2f}")
+        print(f"heap growth:        {(after - before) / 1024:,.0f} KiB ({(after - before) / args.sessions:,.0f} B/session incl. bookings)")
+        print(f"max RSS:            {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
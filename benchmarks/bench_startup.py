@@ -0,0 +1,108 @@
+"""Cold-start benchmark: import cost and time to first response.
+
+Each measurement runs in a fresh interpreter. Import cost comes from
+``python -X importtime``. Time to first response covers interpreter start,
+imports, AirlineAssistant construction and one chat turn with a zero-latency
+fake model. Results are printed and can be written to and compared with a
+JSON baseline to catch regressions:
+
+    python -m benchmarks.bench_startup --output startup.json
+    python -m benchmarks.bench_startup --baseline startup.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay importable without the UI or model stack
+CORE_MODULES = ["flight_db", "booking", "assistant"]
+HEAVY_MODULES = ["gradio", "google.generativeai", "pandas"]
+
+FIRST_RESPONSE_SCRIPT = """
+import os, sys, tempfile, time
+started = time.perf_counter()
+from assistant import AirlineAssistant
+from booking import BookingSystem
+from booking_store import open_store
+from llm import FakeModel
+with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull:
+    stdout, sys.stdout = sys.stdout, devnull
+    assistant = AirlineAssistant(
+        model=FakeModel(first_token_delay=0, token_delay=0),
+        booking_system=BookingSystem(store=open_store(os.path.join(tmp, "bookings.db"))),
+    )
+    assistant.chat("I want to book a business class ticket to Tokyo.", [])
+    sys.stdout = stdout
+print(time.perf_counter() - started)
+"""
+
+
+def run_python(args, **kwargs):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True, **kwargs)
+
+
+def import_time(module):
+    """Cumulative import time of ``module`` in seconds, and the heavy modules it pulled in."""
+    check = f"import sys, {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = run_python(["-X", "importtime", "-c", check])
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [p.strip() for p in line.removeprefix("import time:").split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative = int(parts[1])
+    return cumulative / 1e6, [m for m in result.stdout.strip().split(",") if m]
+
+
+def first_response_time():
+    started = time.perf_counter()
+    result = run_python(["-c", FIRST_RESPONSE_SCRIPT])
+    return time.perf_counter() - started, float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare with a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = {}
+    for module in CORE_MODULES + ["app"]:
+        samples = [import_time(module) for _ in range(args.runs)]
+        results[f"import_{module}"] = statistics.median(s[0] for s in samples)
+        heavy = samples[0][1]
+        print(f"import {module:<10} {results[f'import_{module}'] * 1000:8.1f} ms   loads: {', '.join(heavy) or '-'}")
+        if module in CORE_MODULES and heavy:
+            sys.exit(f"FAIL: importing {module} loads {', '.join(heavy)}")
+
+    samples = [first_response_time() for _ in range(args.runs)]
+    results["process_to_first_response"] = statistics.median(s[0] for s in samples)
+    results["import_to_first_response"] = statistics.median(s[1] for s in samples)
+    print(f"first response       {results['process_to_first_response'] * 1000:8.1f} ms from process start "
+          f"({results['import_to_first_response'] * 1000:.1f} ms after interpreter start-up)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = [
+            f"{key}: {baseline[key] * 1000:.1f} ms -> {value * 1000:.1f} ms"
+            for key, value in results.items()
+            if key in baseline and value > baseline[key] * (1 + args.tolerance)
+        ]
+        if regressions:
+            sys.exit("FAIL: startup regressions\n  " + "\n  ".join(regressions))
+        print(f"no regressions beyond {args.tolerance:.0%} of baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Time-to-first-token and concurrency benchmark for the streaming chat path.
+
+Runs many concurrent chats against llm.FakeModel (no network), comparing the
+blocking ``chat`` on a thread pool with the async ``chat_stream``:
+
+    python -m benchmarks.bench_streaming --chats 200 --max-inflight 8 64
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from assistant import AirlineAssistant
+from booking import BookingSystem
+from booking_store import open_store
+from llm import FakeModel
+
+
+def summarize(label, ttft, total, elapsed, chats):
+    print(f"{label:<28} ttft p50 {statistics.median(ttft) * 1000:7.1f} ms  "
+          f"p95 {statistics.quantiles(ttft, n=20)[-1] * 1000:7.1f} ms  "
+          f"total p50 {statistics.median(total) * 1000:7.1f} ms  "
+          f"{chats / elapsed:8.1f} chats/s")
+
+
+def run_sync(assistant, chats, workers):
+    def one(idx):
+        started = time.perf_counter()
+        assistant.chat("I want to book economy to Paris.", [], SimpleNamespace(session_hash=f"sync-{idx}"))
+        latency = time.perf_counter() - started
+        return latency, latency
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(one, range(chats)))
+    return [r[0] for r in results], [r[1] for r in results], time.perf_counter() - started
+
+
+async def run_stream(assistant, chats):
+    async def one(idx):
+        started = time.perf_counter()
+        first = None
+        async for _ in assistant.chat_stream("I want to book economy to Paris.", [],
+                                             SimpleNamespace(session_hash=f"stream-{idx}")):
+            if first is None:
+                first = time.perf_counter() - started
+        return first, time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(chats)))
+    return [r[0] for r in results], [r[1] for r in results], time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=16, help="worker threads for the blocking path")
+    parser.add_argument("--max-inflight", type=int, nargs="+", default=[8, 64])
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    args = parser.parse_args()
+
+    model = FakeModel(first_token_delay=args.first_token_delay, token_delay=args.token_delay)
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        booking_system = BookingSystem(store=open_store(os.path.join(tmp, "bookings.db")))
+        results = [("chat, %d threads" % args.threads, run_sync(AirlineAssistant(model, booking_system), args.chats, args.threads))]
+        for limit in args.max_inflight:
+            assistant = AirlineAssistant(model, booking_system, max_inflight=limit)
+            results.append((f"chat_stream, {limit} in flight", asyncio.run(run_stream(assistant, args.chats))))
+
+    for label, (ttft, total, elapsed) in results:
+        summarize(label, ttft, total, elapsed, args.chats)
+
+
+if __name__ == "__main__":
+    main()
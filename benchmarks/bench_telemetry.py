@@ -0,0 +1,99 @@
+"""Instrumentation overhead benchmark: spans, counters, level-gated logging and sampled profiling.
+
+Measures the per-call cost of the telemetry primitives, then runs booking
+chats through ``chat`` with llm.FakeModel (no network) and prints the span
+breakdown that /metrics would expose:
+
+    python -m benchmarks.bench_telemetry --calls 200000 --chats 300
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from assistant import AirlineAssistant
+from booking import BookingSystem
+from booking_store import open_store
+from llm import FakeModel
+from telemetry import Metrics, log, metrics, profiler
+
+BOOKING = {"destination": "tokyo", "date": "2025-11-20", "num_tickets": 2, "ticket_class": "business",
+           "email": "alex@example.com", "full_name": "Alex Doe", "seat_preferences": {"location": "window"}}
+DESTINATIONS = ["London", "Paris", "Tokyo", "Berlin", "Mumbai"]
+
+
+def per_call(fn, calls):
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - started) / calls
+
+
+def run_chats(assistant, chats):
+    started = time.perf_counter()
+    for idx in range(chats):
+        request = SimpleNamespace(session_hash=f"chat-{idx}")
+        day = (date.today() + timedelta(days=idx % 20 + 2)).isoformat()
+        first = f"I want to book economy to {DESTINATIONS[idx % len(DESTINATIONS)]} on {day}"
+        reply = assistant.chat(first, [], request)
+        assistant.chat(f"My email is traveller{idx}@example.com", [(first, reply)], request)
+    return (time.perf_counter() - started) / (chats * 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--chats", type=int, default=300)
+    args = parser.parse_args()
+
+    registry = Metrics()
+
+    def empty_span():
+        with registry.span("noop"):
+            pass
+
+    baseline = per_call(lambda: None, args.calls)
+    print(f"span         {(per_call(empty_span, args.calls) - baseline) * 1e6:6.2f} us")
+    print(f"counter inc  {(per_call(lambda: registry.inc('hits', path='fast'), args.calls) - baseline) * 1e6:6.2f} us")
+
+    # The debug dumps the chat path used to print on every turn, disabled versus always formatted
+    logging.basicConfig(level=logging.INFO)
+
+    def gated_debug():
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("📝 Extracted Booking Details: %s", json.dumps(BOOKING, indent=2))
+
+    with open(os.devnull, "w") as devnull:
+        def unconditional():
+            print(f"📝 Extracted Booking Details: {json.dumps(BOOKING, indent=2)}", file=devnull)
+        print(f"debug dump   disabled {(per_call(gated_debug, args.calls) - baseline) * 1e6:6.2f} us   "
+              f"formatted and printed {(per_call(unconditional, args.calls // 10) - baseline) * 1e6:6.2f} us")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        booking_system = BookingSystem(store=open_store(os.path.join(tmp, "bookings.db")))
+        assistant = AirlineAssistant(FakeModel(first_token_delay=0, token_delay=0), booking_system)
+        metrics.reset()
+        turn = run_chats(assistant, args.chats)
+        print(f"chat turn    {turn * 1000:6.2f} ms  (instant model, spans on)")
+        profiler.rate, profiler.directory = 1.0, os.path.join(tmp, "profiles")
+        profiled = run_chats(assistant, args.chats // 10 or 1)
+        profiler.rate = 0.0
+        print(f"             {profiled * 1000:6.2f} ms  profiled, "
+              f"{len(os.listdir(profiler.directory))} .prof files written")
+
+    print("span breakdown (count, mean):")
+    for span in ("extraction", "fast_path", "prompt_build", "model_call",
+                 "book_ticket", "booking_lookup"):
+        count, total = metrics.histogram("flightly_span_seconds", span=span)
+        print(f"  {span:<16} {count:6d}  {total / max(count, 1) * 1e6:9.1f} us")
+    for op in ("insert", "update"):
+        count, total = metrics.histogram("flightly_span_seconds", span="booking_write", op=op)
+        print(f"  {'write ' + op:<16} {count:6d}  {total / max(count, 1) * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
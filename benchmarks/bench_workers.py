@@ -0,0 +1,157 @@
+"""Multi-process booking check: N workers booking the same flights through one shared SQLite store.
+
+Every worker opens the store in shared mode and books random parties on the
+same few flights at once (single bookings, rebookings and book_many chunks),
+with more demand than seats. Afterwards the parent checks that no flight is
+oversold, sold-out flights are exactly full, no seat number is given twice,
+booking IDs are unique, the shared loyalty ledger matches the bookings and
+the booking report matches a backfill from the store. A two-instance check
+first updates one worker's booking from another and compares both reports:
+
+    python -m benchmarks.bench_workers --workers 1 4 8 --bookings 300
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import date, timedelta
+
+FLIGHTS = [("london", "economy"), ("paris", "business"), ("tokyo", "first"), ("berlin", "economy")]
+
+
+def worker(idx, path, bookings, barrier, results):
+    os.environ["FLIGHTLY_NODE_ID"] = str(idx)
+    logging.disable(logging.WARNING)  # sold-out flights log a warning per refused booking
+    from booking import BookingSystem
+    from booking_store import open_store
+
+    system = BookingSystem(store=open_store(path, shared=True), shared=True)
+    rng = random.Random(idx)
+    day = (date.today() + timedelta(days=1)).isoformat()
+    requests = []
+    for n in range(bookings):
+        destination, ticket_class = rng.choice(FLIGHTS)
+        requests.append({"destination": destination, "ticket_class": ticket_class, "date": day,
+                         "num_tickets": rng.choice([1, 1, 2, 3]), "email": f"w{idx}-{n}@example.com",
+                         "full_name": f"Worker {idx} #{n}", "seat_preferences": {"location": rng.choice(["window", "aisle", None])}})
+    barrier.wait()
+    started = time.perf_counter()
+    booked = 0
+    for n, request in enumerate(requests):
+        if n % 10 == 9:
+            # Rebook an earlier customer onto another flight, releasing their old seats
+            earlier = requests[rng.randrange(n)]
+            destination, ticket_class = rng.choice(FLIGHTS)
+            result = system.book_ticket(destination, earlier["num_tickets"], ticket_class, earlier["email"], day,
+                                        earlier["full_name"])
+        elif n % 10 == 8:
+            chunk = [requests[n], {**requests[n], "email": f"w{idx}-{n}-bulk@example.com"}]
+            booked += sum("success" in r for r in system.book_many(chunk))
+            continue
+        else:
+            result = system.book_ticket(request["destination"], request["num_tickets"], request["ticket_class"],
+                                        request["email"], day, request["full_name"], request["seat_preferences"])
+        booked += "success" in result
+    results.put((idx, booked, time.perf_counter() - started))
+    system.ledger.close()
+    system.store.close()
+
+
+def negative_totals(report):
+    return {name: {key: value for key, value in totals.items() if value < 0}
+            for name, totals in report.snapshot().items() if any(value < 0 for value in totals.values())}
+
+
+def check_shared_reports():
+    """Worker B updates a booking worker A made after B started; both reports must match the store."""
+    from booking import BookingSystem
+    from booking_store import open_store
+    from reporting import BookingReport
+
+    day = (date.today() + timedelta(days=1)).isoformat()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bookings.db")
+        first = BookingSystem(store=open_store(path, shared=True), shared=True)
+        second = BookingSystem(store=open_store(path, shared=True), shared=True)
+        first.report, second.report  # built before the booking, as in long-running workers
+        assert "success" in first.book_ticket("london", 2, "economy", "alex@example.com", day, "Alex Doe")
+        assert "success" in second.book_ticket("paris", 3, "economy", "alex@example.com", day, "Alex Doe")
+        backfill = BookingReport(first.flight_db.seat_capacity)
+        backfill.add_many(first.store.rows())
+        for name, system in (("first", first), ("second", second)):
+            assert not negative_totals(system.report), f"{name} worker's report has negative totals: {negative_totals(system.report)}"
+            assert system.report.snapshot() == backfill.snapshot(), f"{name} worker's report differs from the store"
+        for system in (first, second):
+            system.ledger.close()
+            system.store.close()
+    print("two workers updating each other's bookings: reports match the store")
+
+
+def run(workers, bookings):
+    from booking import BookingSystem
+    from booking_store import open_store
+    from reporting import BookingReport
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bookings.db")
+        open_store(path, shared=True).close()
+        ctx = multiprocessing.get_context("spawn")
+        barrier = ctx.Barrier(workers)
+        results = ctx.Queue()
+        processes = [ctx.Process(target=worker, args=(idx, path, bookings, barrier, results)) for idx in range(workers)]
+        for process in processes:
+            process.start()
+        outcomes = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0, f"worker exited with {process.exitcode}"
+
+        system = BookingSystem(store=open_store(path, shared=True), shared=True)
+        rows = list(system.store.rows())
+        capacity = system.flight_db.seat_capacity
+        sold = Counter()
+        seats = defaultdict(list)
+        for row in rows:
+            flight = (row["destination"], row["date"], row["ticket_class"])
+            sold[flight] += row["num_tickets"]
+            labels = json.loads(row["seat_numbers"] or "[]")
+            assert len(labels) == row["num_tickets"], f"{row['booking_id']} has {len(labels)} seats for {row['num_tickets']} tickets"
+            seats[flight].extend(labels)
+        for flight, count in sold.items():
+            assert count <= capacity[flight[2]], f"{flight} oversold: {count} > {capacity[flight[2]]}"
+            assert len(set(seats[flight])) == len(seats[flight]), f"{flight} has a seat assigned twice"
+            # Another process's view must agree with the store
+            assert system.flight_db.check_availability(*flight) == capacity[flight[2]] - count
+        assert len({row["booking_id"] for row in rows}) == len(rows), "duplicate booking IDs"
+        assert len({row["email"] for row in rows}) == len(rows), "duplicate bookings for one email"
+        expected_points = sum(row["loyalty_points"] for row in rows)
+        assert sum(system.ledger.balances().values()) == expected_points, "loyalty ledger differs from bookings"
+        backfill = BookingReport(capacity)
+        backfill.add_many(rows)
+        assert not negative_totals(system.report), "booking report has negative totals"
+        assert system.report.snapshot() == backfill.snapshot(), "booking report differs from the store"
+        system.store.close()
+        wall = max(elapsed for _, _, elapsed in outcomes)
+        attempts = workers * bookings
+        print(f"{workers:2d} workers  {attempts / wall:8,.0f} booking calls/s  {len(rows):5d} bookings  sold "
+              + "  ".join(f"{flight[0]}/{flight[2]} {count}/{capacity[flight[2]]}" for flight, count in sorted(sold.items()))
+              + "  checks passed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--bookings", type=int, default=300, help="booking calls per worker")
+    args = parser.parse_args()
+    check_shared_reports()
+    for workers in args.workers:
+        run(workers, args.bookings)
+
+
+if __name__ == "__main__":
+    main()
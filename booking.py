@@ -0,0 +1,587 @@
+import os
+import csv
+import json
+from contextlib import nullcontext
+from datetime import datetime
+from itertools import islice
+from booking_store import open_store
+from extraction import VALID_EMAIL_PATTERN
+from flight_db import FlightDatabase, parse_date
+from ids import BookingIdGenerator, decode, encode, scramble
+from loyalty import LoyaltyLedger
+from reporting import BookingReport
+from telemetry import log, metrics, profiler
+
+def iter_booking_requests(path):
+    """Stream booking requests from a CSV or JSONL file, one dict per row.
+
+    A JSONL line that does not parse is yielded as a ValueError, which
+    book_many reports as that row's error.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        request = json.loads(line)
+                    except ValueError as e:
+                        request = ValueError(f"Invalid JSON on line {number}: {e}")
+                    yield request
+        else:
+            yield from csv.DictReader(f)
+
+def _json_field(value, default):
+    # Values from CSV imports are already JSON text; dicts and lists from callers are encoded here
+    if isinstance(value, str):
+        return value
+    return json.dumps(value or default)
+
+def _json_value(value):
+    # The inverse of _json_field, for requests that are handed on to book_ticket
+    if not isinstance(value, str):
+        return value
+    try:
+        return json.loads(value) if value else None
+    except ValueError:
+        return value
+
+class BookingSystem:
+    def __init__(self, store=None, ledger=None, shared=None):
+        # Use absolute path for CSV file
+        self.db_file = os.path.join(os.path.dirname(__file__), 'bookings.csv')
+        self.flight_db = FlightDatabase()
+        # Shared mode lets several worker processes book against one SQLite store (FLIGHTLY_SHARED_STATE=1)
+        self.shared = shared if shared is not None else os.getenv('FLIGHTLY_SHARED_STATE') == '1'
+        self.store = store if store is not None else self._open_default_store()
+        if self.shared and not getattr(self.store, "shared", False):
+            raise ValueError("Shared mode needs a store opened with open_store(path, shared=True)")
+        # Processes sharing a store need distinct node IDs (FLIGHTLY_NODE_ID) to keep booking IDs unique
+        self.ids = BookingIdGenerator()
+        self._report = BookingReport(self.flight_db.seat_capacity)
+        # Store data_version the shared-mode report was built at; None means rebuild on the next read
+        self._report_version = None
+        # The loyalty ledger sits next to the booking store unless FLIGHTLY_LOYALTY_LEDGER points elsewhere
+        self.ledger = ledger if ledger is not None else LoyaltyLedger(
+            os.getenv('FLIGHTLY_LOYALTY_LEDGER') or f"{os.path.splitext(self.store.path)[0]}.loyalty.jsonl",
+            expiry_days=int(os.getenv('FLIGHTLY_POINTS_EXPIRY_DAYS', '365')),
+            shared=self.shared
+        )
+        self._load_seat_holds()
+        if self.shared:
+            self.flight_db.follow(self.store, float(os.getenv('FLIGHTLY_SHARED_REFRESH', '1.0')))
+
+    def _open_default_store(self):
+        store_file = os.getenv('FLIGHTLY_BOOKING_STORE', os.path.join(os.path.dirname(__file__), 'bookings.db'))
+        is_new = not os.path.exists(store_file)
+        store = open_store(store_file, shared=self.shared)
+        # Seed a fresh store from an existing bookings.csv so older deployments keep their history
+        if is_new and os.path.exists(self.db_file):
+            with store.transaction():
+                # Workers starting together may all see a new file; only the first one imports
+                if not len(store):
+                    store.import_csv(self.db_file)
+        return store
+
+    def _load_seat_holds(self):
+        # Seat inventory and report totals live in memory, so rebuild both from stored bookings on startup
+        # A new ledger is seeded with the points of bookings made before it existed
+        earnings = [] if self.ledger.transactions == 0 else None
+        def holding_seats(rows):
+            for booking in rows:
+                itinerary = self._itinerary(booking)
+                # Bookings for dates outside the window hold nothing (reserve refuses them)
+                if itinerary and self.flight_db.reserve(*itinerary):
+                    self.flight_db.hold_seats(*itinerary[:3], self._seat_numbers(booking))
+                if earnings is not None:
+                    earnings.append((booking.get("email"), booking.get("loyalty_points"), booking.get("booking_id")))
+                yield booking
+        bookings = holding_seats(self.store.rows())
+        if self.shared:
+            # Other workers keep writing, so the shared-mode report is built from the store when first read
+            for _ in bookings:
+                pass
+        else:
+            self._report.add_many(bookings)
+        if earnings:
+            self.ledger.seed(earnings)
+
+    @property
+    def report(self):
+        """Running booking aggregates (see BookingReport).
+
+        In shared mode this process only sees its own writes, so the report is
+        rebuilt from the store on read whenever the store has changed since it
+        was built (another worker committed, per ``data_version``, or this
+        process wrote). The rebuild rescans the store from a read snapshot, so
+        other workers keep booking while it runs. Writes themselves never
+        touch it.
+        """
+        if self.shared:
+            with self.store.snapshot():
+                version = self.store.data_version()
+                if version != self._report_version:
+                    self._report.rebuild(self.store.rows())
+                    self._report_version = version
+        return self._report
+
+    def _report_booking(self, old, new):
+        """Move the report's totals from ``old`` (None for a new booking) to ``new`` after a write."""
+        if self.shared:
+            self._report_version = None
+        elif old is None:
+            self._report.add(new)
+        else:
+            self._report.replace(old, new)
+
+    def _transaction(self):
+        # In shared mode a booking's read-check-write runs under the store's cross-process write lock
+        return self.store.transaction() if self.shared else nullcontext()
+
+    def _sync_flights(self, *flights):
+        """In shared mode, reload these flights' seat counts and seat numbers from the store first.
+
+        Other processes may have booked them since this process last looked;
+        within a transaction the reloaded state cannot change underneath us.
+        """
+        if not self.shared:
+            return
+        for flight in flights:
+            if flight is None:
+                continue
+            route, date_str, ticket_class = flight[:3]
+            rows = self.store.flight_bookings(route[1], date_str, ticket_class, self.flight_db.stored_origins(route))
+            seats = [label for _, seat_numbers in rows for label in (json.loads(seat_numbers) if seat_numbers else [])]
+            self.flight_db.load_flight(route, date_str, ticket_class, sum(n for n, _ in rows), seats)
+
+    def _itinerary(self, booking):
+        """Return the (route, date, class, seats) a booking holds, or None for drafts.
+
+        The route is the flight database's (origin, destination) key; bookings
+        without an origin hold the destination's default route.
+        """
+        destination = booking.get("destination")
+        date_str = booking.get("date")
+        ticket_class = booking.get("ticket_class")
+        num_tickets = booking.get("num_tickets")
+        if destination and date_str and ticket_class and num_tickets:
+            route = self.flight_db.route_key(destination, booking.get("origin"))
+            return (route, date_str, ticket_class.lower(), int(num_tickets))
+        return None
+
+    def _seat_numbers(self, booking):
+        value = booking.get("seat_numbers")
+        return json.loads(value) if value else []
+
+    def _assign_seat_numbers(self, itinerary, seat_prefs):
+        """Seat numbers (as stored JSON) for an itinerary that already holds its seats."""
+        if itinerary is None:
+            return json.dumps([])
+        route, date_str, ticket_class, num_tickets = itinerary
+        preferences = seat_prefs if isinstance(seat_prefs, dict) else None
+        return json.dumps(self.flight_db.assign_seats(route, date_str, ticket_class, num_tickets, preferences))
+
+    def _release_seat_numbers(self, itinerary, booking):
+        if itinerary is not None:
+            self.flight_db.release_seats(*itinerary[:3], self._seat_numbers(booking))
+
+    def _reassign_seat_numbers(self, itinerary, booking, seat_prefs):
+        """Seat numbers (as stored JSON) for a booking reseated on its own flight, or None if they do not fit."""
+        route, date_str, ticket_class, num_tickets = itinerary
+        preferences = seat_prefs if isinstance(seat_prefs, dict) else None
+        seats = self.flight_db.reassign_seats(route, date_str, ticket_class, self._seat_numbers(booking),
+                                              num_tickets, preferences)
+        return json.dumps(seats) if seats else None
+
+    def _move_seats(self, old, new):
+        """Move a booking's seat hold from the old itinerary to the new one; False if the new one does not fit.
+
+        On the same flight only the change in party size is reserved or
+        released, so a booking can grow into seats it already holds. On
+        another flight the new seats are reserved before the old ones are
+        given back.
+        """
+        if old == new:
+            return True
+        if old is not None and new is not None and old[:3] == new[:3]:
+            extra = new[3] - old[3]
+            if extra > 0:
+                return self.flight_db.reserve(*new[:3], extra)
+            self.flight_db.release(*new[:3], -extra)
+            return True
+        if new is not None and not self.flight_db.reserve(*new):
+            return False
+        if old is not None:
+            self.flight_db.release(*old)
+        return True
+
+    def _no_seats_error(self, itinerary):
+        route, date_str, ticket_class, num_tickets = itinerary
+        available = self.flight_db.check_availability(route, date_str, ticket_class)
+        metrics.inc("flightly_bookings_total", result="no_seats")
+        log.warning("❌ Not enough seats: requested %s, available %s", num_tickets, available)
+        return {"error": f"Only {available} {ticket_class} seats left to {route[1]} on {date_str}"}
+
+    def export_csv(self, path=None):
+        """Export all bookings to CSV (defaults to bookings.csv)."""
+        self.store.export_csv(path or self.db_file)
+        
+    def generate_booking_id(self):
+        return f"BK-{encode(self.ids.next_id())}"
+    
+    def calculate_loyalty_points(self, price):
+        return int(price * 0.1)  
+
+    def loyalty_balance(self, email):
+        """Live loyalty points balance for a customer, from the ledger's cached balances."""
+        return self.ledger.balance(email)
+    
+    def validate_email(self, email):
+        return bool(VALID_EMAIL_PATTERN.match(email))
+    
+    def generate_confirmation_code(self, booking_id):
+        # A bijection of the ID, so distinct booking IDs never share a code
+        return encode(scramble(decode(booking_id[3:])))
+
+    def _new_booking_keys(self, count):
+        """Return ``count`` (booking_id, confirmation_code) pairs, none clashing with a stored booking."""
+        keys = []
+        while len(keys) < count:
+            ids = [f"BK-{encode(value)}" for value in self.ids.next_ids(count - len(keys))]
+            candidates = [(booking_id, self.generate_confirmation_code(booking_id)) for booking_id in ids]
+            # Only bookings imported from elsewhere can hold a code this scheme would produce
+            clashes = self.store.existing_confirmation_codes(code for _, code in candidates)
+            if clashes:
+                log.warning("⚠️ Confirmation code clash with stored bookings: %s", sorted(clashes))
+            keys.extend(pair for pair in candidates if pair[1] not in clashes)
+        return keys
+    
+    def find_booking(self, email):
+        """Find an existing booking by email."""
+        return self.store.find_by_email(email)
+    
+    def update_booking(self, email, new_data):
+        """Update an existing booking in the booking store."""
+        return self.store.update_by_email(email, new_data)
+    
+    def book_ticket(self, destination, num_tickets, ticket_class, email, date_str, full_name,
+                   seat_prefs=None, meal_prefs=None, medical_needs=None, special_requests=None, origin=None):
+        """Create or update the booking for ``email``; without ``origin`` the destination's default route is used."""
+        with profiler.profile("book_ticket"), metrics.span("book_ticket"), self._transaction():
+            return self._book_ticket(destination, num_tickets, ticket_class, email, date_str, full_name,
+                                     seat_prefs, meal_prefs, medical_needs, special_requests, origin)
+
+    def _book_ticket(self, destination, num_tickets, ticket_class, email, date_str, full_name,
+                     seat_prefs, meal_prefs, medical_needs, special_requests, origin):
+        try:
+            log.debug("📌 Attempting to save booking...")
+            log.debug("✈️ Destination: %s, 🎟️ Tickets: %s, 🏷️ Class: %s", destination, num_tickets, ticket_class)
+            log.debug("📧 Email: %s, 📆 Date: %s, 📝 Name: %s", email, date_str, full_name)
+
+            if not email or not self.validate_email(email):
+                metrics.inc("flightly_bookings_total", result="invalid_email")
+                log.warning("❌ Invalid Email!")
+                return {"error": "Invalid email address"}
+
+            # Chats save the email as soon as it is given, often before the destination
+            if self.flight_db.get_price(destination or "", ticket_class or "", origin) is None:
+                metrics.inc("flightly_bookings_total", result="no_fare")
+                log.warning("❌ No %s fare to %s", ticket_class, destination or "unknown destination")
+                return {"error": f"No {ticket_class} fare to {destination or 'unknown destination'}"}
+            
+            # Check if a booking already exists for this email
+            with metrics.span("booking_lookup"):
+                existing_booking = self.find_booking(email)
+            if existing_booking:
+                log.debug("🔄 Updating existing booking...")
+                # A change that names no origin keeps the booking's route to the same destination
+                if not origin and destination.lower() == (existing_booking.get("destination") or "").lower():
+                    origin = existing_booking.get("origin")
+                # Update the existing booking with new data
+                new_data = {
+                    "destination": destination.lower(),
+                    "origin": self.flight_db.route_key(destination, origin)[0] or None,
+                    "date": date_str,
+                    "num_tickets": num_tickets,
+                    "ticket_class": ticket_class,
+                    "seat_preferences": json.dumps(seat_prefs or {}),
+                    "meal_preferences": json.dumps(meal_prefs or {}),
+                    "medical_assistance": json.dumps(medical_needs or []),
+                    "special_requests": special_requests or "",
+                    "booking_time": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                }
+                old_itinerary = self._itinerary(existing_booking)
+                new_itinerary = self._itinerary(new_data)
+                self._sync_flights(old_itinerary, new_itinerary)
+                if not self._move_seats(old_itinerary, new_itinerary):
+                    return self._no_seats_error(new_itinerary)
+                # Seat numbers only change with the flight, party size or seat preferences
+                reseat = (new_itinerary != old_itinerary
+                          or new_data["seat_preferences"] != existing_booking.get("seat_preferences"))
+                # On the same flight the booking's own seats are freed and reassigned in one step
+                same_flight = (reseat and old_itinerary is not None and new_itinerary is not None
+                               and old_itinerary[:3] == new_itinerary[:3])
+                if same_flight:
+                    new_data["seat_numbers"] = self._reassign_seat_numbers(new_itinerary, existing_booking, seat_prefs)
+                    if new_data["seat_numbers"] is None:
+                        self._move_seats(new_itinerary, old_itinerary)
+                        return self._no_seats_error(new_itinerary)
+                elif reseat:
+                    new_data["seat_numbers"] = self._assign_seat_numbers(new_itinerary, seat_prefs)
+                try:
+                    with metrics.span("booking_write", op="update"):
+                        self.update_booking(email, new_data)
+                except Exception:
+                    if reseat:
+                        self._release_seat_numbers(new_itinerary, new_data)
+                    if same_flight:
+                        self.flight_db.hold_seats(*old_itinerary[:3], self._seat_numbers(existing_booking))
+                    self._move_seats(new_itinerary, old_itinerary)
+                    raise
+                if reseat and not same_flight:
+                    self._release_seat_numbers(old_itinerary, existing_booking)
+                updated_booking = {**existing_booking, **new_data}
+                self._report_booking(existing_booking, updated_booking)
+                metrics.inc("flightly_bookings_total", result="updated")
+                return {"success": True, "booking_details": updated_booking}
+            else:
+                log.debug("🆕 Creating new booking...")
+                # Create a new booking
+                [(booking_id, confirmation_code)] = self._new_booking_keys(1)
+                route = self.flight_db.route_key(destination, origin)
+                total_price = num_tickets * self.flight_db.get_price(route, ticket_class)
+                loyalty_points = self.calculate_loyalty_points(total_price)
+
+                booking_data = {
+                    "booking_id": booking_id,
+                    "confirmation_code": confirmation_code,
+                    "full_name": full_name,
+                    "email": email,
+                    "destination": destination.lower(),
+                    "origin": route[0] or None,
+                    "date": date_str,
+                    "num_tickets": num_tickets,
+                    "ticket_class": ticket_class,
+                    "total_price": total_price,
+                    "loyalty_points": loyalty_points,
+                    "seat_preferences": json.dumps(seat_prefs or {}),
+                    "meal_preferences": json.dumps(meal_prefs or {}),
+                    "medical_assistance": json.dumps(medical_needs or []),
+                    "special_requests": special_requests or "",
+                    "booking_time": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                }
+
+                itinerary = self._itinerary(booking_data)
+                self._sync_flights(itinerary)
+                if not self._move_seats(None, itinerary):
+                    return self._no_seats_error(itinerary)
+                booking_data["seat_numbers"] = self._assign_seat_numbers(itinerary, seat_prefs)
+
+                # Append new booking data
+                try:
+                    with metrics.span("booking_write", op="insert"):
+                        self.store.insert(booking_data)
+                except Exception:
+                    self._release_seat_numbers(itinerary, booking_data)
+                    self._move_seats(itinerary, None)
+                    raise
+                self._report_booking(None, booking_data)
+                self.ledger.earn(email, loyalty_points, booking_id)
+
+                metrics.inc("flightly_bookings_total", result="created")
+                log.info("✅ Booking saved successfully!")
+                return {"success": True, "booking_details": booking_data}
+
+        except Exception as e:
+            metrics.inc("flightly_bookings_total", result="error")
+            log.exception("❌ Error while saving booking: %s", e)
+            return {"error": f"Booking process failed: {str(e)}"}
+
+    def book_many(self, requests, chunk_size=1000):
+        """Book many new tickets in chunks, yielding one result per request in input order.
+
+        Each request is a dict with the booking fields (destination, num_tickets,
+        ticket_class, email, date, full_name and optional origin, seat_preferences,
+        meal_preferences, medical_assistance, special_requests). A chunk is
+        validated together, its seats are reserved with one call per flight
+        and its bookings are written with a single ``insert_many``. Requests
+        whose email already has a booking (or repeats within the chunk) go
+        through ``book_ticket`` so they update it, as single bookings do.
+        Results carry the request's ``row`` index and either ``success`` and
+        ``booking_details`` or ``error``; memory is bounded by ``chunk_size``.
+        """
+        requests = iter(requests)
+        row = 0
+        while True:
+            chunk = list(islice(requests, chunk_size))
+            if not chunk:
+                return
+            with self._transaction():
+                results = self._book_chunk(row, chunk)
+            yield from results
+            row += len(chunk)
+
+    def import_bookings(self, path, chunk_size=1000):
+        """Bulk-book every request in a CSV or JSONL file; see book_many."""
+        return self.book_many(iter_booking_requests(path), chunk_size)
+
+    def _book_chunk(self, first_row, chunk):
+        results = [None] * len(chunk)
+        flight_db = self.flight_db
+        flight_db._roll_window()
+        first_day, last_day = flight_db.inventory.first_day, flight_db.inventory.last_day
+        booking_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        prices = {}
+        existing = self.store.existing_emails(
+            request.get("email") for request in chunk
+            if isinstance(request, dict) and isinstance(request.get("email"), str)
+        )
+        seen = set()
+        new_bookings = {}
+        deferred = []
+
+        # Validate the whole chunk before touching inventory
+        for idx, request in enumerate(chunk):
+            if not isinstance(request, dict):
+                # Lines iter_booking_requests could not parse arrive as their error
+                error = str(request) if isinstance(request, ValueError) else "Booking request is not a mapping"
+                results[idx] = {"row": first_row + idx, "error": error}
+                continue
+            email = request.get("email")
+            destination = request.get("destination") or ""
+            ticket_class = request.get("ticket_class") or "economy"
+            origin = request.get("origin") or ""
+            date_str = request.get("date") or request.get("date_str") or ""
+            try:
+                num_tickets = int(request.get("num_tickets") or 1)
+            except (TypeError, ValueError):
+                num_tickets = 0
+            day = parse_date(date_str)
+            is_text = all(isinstance(value, str) for value in (destination, ticket_class, origin))
+            price = None
+            if is_text:
+                destination, ticket_class = destination.lower(), ticket_class.lower()
+                route = flight_db.route_key(destination, origin)
+                key = (route, ticket_class)
+                if key not in prices:
+                    prices[key] = flight_db.get_price(route, ticket_class)
+                price = prices[key]
+
+            if not isinstance(email, str) or not self.validate_email(email):
+                error = "Invalid email address"
+            elif not is_text:
+                error = "Destination, origin and ticket class must be text"
+            elif num_tickets <= 0:
+                error = "Invalid number of tickets"
+            elif price is None:
+                error = f"No {ticket_class} fare to {destination or 'unknown destination'}"
+            elif day is None:
+                error = "Invalid date format. Use YYYY-MM-DD"
+            elif not first_day <= day <= last_day:
+                error = f"Date outside the booking window ({first_day.isoformat()} to {last_day.isoformat()})"
+            elif email in existing or email in seen:
+                # Updates are checked like new bookings first, so a bad row never rewrites a booking
+                deferred.append((idx, destination, num_tickets, ticket_class, date_str, origin))
+                continue
+            else:
+                total_price = num_tickets * price
+                try:
+                    booking = {
+                        "booking_id": None,
+                        "confirmation_code": None,
+                        "full_name": request.get("full_name") or "",
+                        "email": email,
+                        "destination": destination,
+                        "origin": route[0] or None,
+                        "date": date_str,
+                        "num_tickets": num_tickets,
+                        "ticket_class": ticket_class,
+                        "total_price": total_price,
+                        "loyalty_points": self.calculate_loyalty_points(total_price),
+                        "seat_preferences": _json_field(request.get("seat_preferences"), {}),
+                        "meal_preferences": _json_field(request.get("meal_preferences"), {}),
+                        "medical_assistance": _json_field(request.get("medical_assistance"), []),
+                        "special_requests": request.get("special_requests") or "",
+                        "booking_time": booking_time
+                    }
+                except (TypeError, ValueError) as e:
+                    # Preferences that cannot be stored as JSON
+                    error = f"Malformed booking request: {e}"
+                else:
+                    seen.add(email)
+                    new_bookings[idx] = booking
+                    continue
+            results[idx] = {"row": first_row + idx, "error": error}
+
+        for booking, (booking_id, confirmation_code) in zip(new_bookings.values(),
+                                                           self._new_booking_keys(len(new_bookings))):
+            booking["booking_id"] = booking_id
+            booking["confirmation_code"] = confirmation_code
+
+        # Reserve each flight's total demand at once, falling back to row by row when it does not all fit
+        demand = {}
+        for idx, booking in new_bookings.items():
+            demand.setdefault(self._itinerary(booking)[:3], []).append(idx)
+        self._sync_flights(*demand)
+        reserved = []
+        for flight, rows in demand.items():
+            if len(rows) > 1 and flight_db.reserve(*flight, sum(new_bookings[i]["num_tickets"] for i in rows)):
+                reserved.extend(rows)
+                continue
+            for idx in rows:
+                if flight_db.reserve(*flight, new_bookings[idx]["num_tickets"]):
+                    reserved.append(idx)
+                else:
+                    available = flight_db.check_availability(*flight)
+                    results[idx] = {"row": first_row + idx,
+                                    "error": f"Only {available} {flight[2]} seats left to {flight[0][1]} on {flight[1]}"}
+        reserved.sort()
+        for idx in reserved:
+            booking = new_bookings[idx]
+            booking["seat_numbers"] = self._assign_seat_numbers(
+                self._itinerary(booking), _json_value(booking["seat_preferences"])
+            )
+
+        # One write for the whole chunk
+        try:
+            with metrics.span("booking_write", op="insert_many"):
+                self.store.insert_many(new_bookings[idx] for idx in reserved)
+        except Exception as e:
+            for idx in reserved:
+                self._release_seat_numbers(self._itinerary(new_bookings[idx]), new_bookings[idx])
+                self._move_seats(self._itinerary(new_bookings[idx]), None)
+                results[idx] = {"row": first_row + idx, "error": f"Booking process failed: {str(e)}"}
+        else:
+            if self.shared:
+                self._report_version = None
+            else:
+                self._report.add_many(new_bookings[idx] for idx in reserved)
+            self.ledger.earn_many(
+                (new_bookings[idx]["email"], new_bookings[idx]["loyalty_points"], new_bookings[idx]["booking_id"])
+                for idx in reserved
+            )
+            for idx in reserved:
+                results[idx] = {"row": first_row + idx, "success": True, "booking_details": new_bookings[idx]}
+            metrics.inc("flightly_bookings_total", len(reserved), result="created")
+
+        # Updates to existing bookings keep the single-booking semantics, after the chunk's inserts
+        for idx, destination, num_tickets, ticket_class, date_str, origin in deferred:
+            request = chunk[idx]
+            result = self.book_ticket(
+                destination=destination,
+                num_tickets=num_tickets,
+                ticket_class=ticket_class,
+                email=request["email"],
+                date_str=date_str,
+                full_name=request.get("full_name") or "",
+                seat_prefs=_json_value(request.get("seat_preferences")),
+                meal_prefs=_json_value(request.get("meal_preferences")),
+                medical_needs=_json_value(request.get("medical_assistance")),
+                special_requests=request.get("special_requests"),
+                origin=origin or None
+            )
+            results[idx] = {"row": first_row + idx, **result}
+
+        succeeded = sum(1 for result in results if "success" in result)
+        log.info("📦 Bulk booking rows %d-%d: %d booked, %d failed",
+                 first_row, first_row + len(chunk) - 1, succeeded, len(chunk) - succeeded)
+        return results
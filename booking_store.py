@@ -0,0 +1,628 @@
+import csv
+import gc
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+
+BOOKING_COLUMNS = [
+    "booking_id", "confirmation_code", "email", "destination", "date",
+    "num_tickets", "ticket_class", "total_price", "loyalty_points",
+    "seat_preferences", "meal_preferences", "medical_assistance",
+    "special_requests", "booking_time", "full_name", "seat_numbers", "origin"
+]
+INTEGER_COLUMNS = {"num_tickets", "loyalty_points"}
+NUMERIC_COLUMNS = {"total_price"}
+
+
+def _parse_csv_value(column, value):
+    if value is None or value == "":
+        return None
+    if column in INTEGER_COLUMNS:
+        return int(float(value))
+    if column in NUMERIC_COLUMNS:
+        number = float(value)
+        return int(number) if number.is_integer() else number
+    return value
+
+
+def _row_from_csv(record):
+    return {column: _parse_csv_value(column, record.get(column)) for column in BOOKING_COLUMNS}
+
+
+def _normalize(booking):
+    return {column: booking.get(column) for column in BOOKING_COLUMNS}
+
+
+class BookingStore(ABC):
+    """Common interface for booking storage backends.
+
+    Backends keep bookings indexed by email, booking_id and confirmation_code
+    so lookups and updates never scan the full booking history. A backend
+    missing one of the abstract methods fails when it is created.
+    """
+
+    @abstractmethod
+    def insert(self, booking):
+        raise NotImplementedError
+
+    def insert_many(self, bookings):
+        count = 0
+        for booking in bookings:
+            self.insert(booking)
+            count += 1
+        return count
+
+    @abstractmethod
+    def find_by_email(self, email):
+        raise NotImplementedError
+
+    def existing_emails(self, emails):
+        """Return the subset of ``emails`` that already have a booking."""
+        return {email for email in emails if self.find_by_email(email) is not None}
+
+    def existing_confirmation_codes(self, codes):
+        """Return the subset of ``codes`` already used by a booking."""
+        return {code for code in codes if self.find_by_confirmation_code(code) is not None}
+
+    @abstractmethod
+    def get(self, booking_id):
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_by_confirmation_code(self, confirmation_code):
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_by_email(self, email, new_data):
+        raise NotImplementedError
+
+    @abstractmethod
+    def rows(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def __len__(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    @contextmanager
+    def transaction(self):
+        """Group the calls in the block into one atomic unit; backends without transactions just run them."""
+        yield
+
+    @contextmanager
+    def snapshot(self):
+        """Run the reads in the block against one consistent view of the store, without taking the write lock."""
+        yield
+
+    @property
+    def in_transaction(self):
+        """True inside this thread's ``transaction`` block."""
+        return False
+
+    def import_csv(self, path):
+        """Load bookings from a CSV file in the legacy bookings.csv format."""
+        with open(path, newline="", encoding="utf-8") as f:
+            return self.insert_many(_row_from_csv(record) for record in csv.DictReader(f))
+
+    def export_csv(self, path):
+        """Write every booking to a CSV file in the legacy bookings.csv format."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=BOOKING_COLUMNS)
+            writer.writeheader()
+            for row in self.rows():
+                writer.writerow({k: ("" if v is None else v) for k, v in row.items()})
+        os.replace(tmp_path, path)
+
+
+class LogBookingStore(BookingStore):
+    """Append-only JSONL booking journal with in-memory indexes.
+
+    Every insert or update is a single appended line, and the journal is
+    replayed on open to rebuild the indexes. A torn final line left by a
+    crash mid-write is cut off on open, so later entries never land behind it.
+
+    With ``sync=True`` a write returns only once its entry has been fsynced.
+    Writers that arrive while an fsync is in progress share the next one
+    (group commit), and ``commit_delay`` seconds of waiting lets the syncing
+    writer gather more of them. Every ``compact_every`` entries the journal is
+    rewritten in the background as snapshot blocks of the live rows, which
+    drops superseded updates and replays thousands of rows per line.
+    """
+
+    SNAPSHOT_BLOCK = 10000
+
+    def __init__(self, path, sync=True, commit_delay=0.0, compact_every=100000):
+        self.path = path
+        self.sync = sync
+        self.commit_delay = commit_delay
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._rows = []
+        self._by_id = {}
+        self._by_email = {}
+        self._by_code = {}
+        # Group commit: entries appended to the file buffer vs. entries known to be on disk
+        self._commit = threading.Condition()
+        self._appended = 0
+        self._synced = 0
+        self._syncing = False
+        self.syncs = 0
+        self._since_compaction = 0
+        self._compactor = None
+        if os.path.exists(f"{path}.compact"):
+            os.remove(f"{path}.compact")  # left by a crash during compaction; the journal is intact
+        if os.path.exists(path):
+            self._replay()
+        self._file = open(path, "a", encoding="utf-8")
+        self._maybe_compact()
+
+    def _replay(self):
+        good = 0  # bytes of complete, valid entries
+        # Replay only creates objects that live on, so cyclic GC passes over them would be wasted work
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    if line.strip():
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            break
+                        self._apply(entry)
+                    good += len(line)
+                f.seek(good)
+                rest = f.read()
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if rest:
+            # A crash only ever tears the last line; anything more is corruption that must not be papered over
+            if b"\n" in rest.rstrip(b"\n"):
+                raise ValueError(f"Booking journal {self.path} is corrupt at byte {good}")
+            with open(self.path, "r+b") as f:
+                f.truncate(good)
+                os.fsync(f.fileno())
+
+    def _apply(self, entry):
+        op = entry["op"]
+        if op == "insert":
+            self._apply_insert(entry["row"])
+            self._since_compaction += 1
+        elif op == "update":
+            self._apply_update(entry["email"], entry["data"])
+            self._since_compaction += 1
+        elif op == "snapshot":
+            columns = entry["columns"]
+            same = columns == BOOKING_COLUMNS
+            for values in entry["rows"]:
+                row = dict(zip(columns, values))
+                self._apply_insert(row if same else _normalize(row))
+
+    def _index(self, pos, row):
+        self._by_id.setdefault(row["booking_id"], pos)
+        self._by_email.setdefault(row["email"], []).append(pos)
+        self._by_code.setdefault(row["confirmation_code"], pos)
+
+    def _unindex(self, pos, row):
+        if self._by_id.get(row["booking_id"]) == pos:
+            del self._by_id[row["booking_id"]]
+        positions = self._by_email.get(row["email"], [])
+        if pos in positions:
+            positions.remove(pos)
+            if not positions:
+                del self._by_email[row["email"]]
+        if self._by_code.get(row["confirmation_code"]) == pos:
+            del self._by_code[row["confirmation_code"]]
+
+    def _apply_insert(self, row):
+        # Rows written by this store already carry every column; older entries may lack newer ones
+        if len(row) != len(BOOKING_COLUMNS):
+            row = _normalize(row)
+        self._rows.append(row)
+        self._index(len(self._rows) - 1, row)
+
+    def _apply_update(self, email, new_data):
+        positions = list(self._by_email.get(email, []))
+        for pos in positions:
+            row = self._rows[pos]
+            self._unindex(pos, row)
+            row.update(new_data)
+            self._index(pos, row)
+        return bool(positions)
+
+    def _append(self, entries):
+        # Called with self._lock held; returns the sequence number that must be on disk before acknowledging
+        self._file.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        if not self.sync:
+            self._file.flush()
+        self._appended += len(entries)
+        self._since_compaction += len(entries)
+        return self._appended
+
+    def _durable(self, sequence):
+        """Wait until entries up to ``sequence`` are fsynced, syncing them (and any others waiting) if needed."""
+        if not self.sync:
+            self._maybe_compact()
+            return
+        with self._commit:
+            while self._synced < sequence and self._syncing:
+                self._commit.wait()
+            if self._synced >= sequence:
+                return
+            self._syncing = True
+        target = None
+        try:
+            if self.commit_delay:
+                time.sleep(self.commit_delay)
+            with self._lock:
+                self._file.flush()
+                target = self._appended
+                fd = self._file.fileno()
+            os.fsync(fd)
+        finally:
+            with self._commit:
+                self._syncing = False
+                if target is not None:
+                    self._synced = max(self._synced, target)
+                    self.syncs += 1
+                self._commit.notify_all()
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._since_compaction >= self.compact_every and self._compactor is None:
+            with self._lock:
+                if self._compactor is not None:
+                    return
+                self._compactor = threading.Thread(target=self.compact, name="journal-compactor", daemon=True)
+            self._compactor.start()
+
+    def compact(self):
+        """Rewrite the journal as snapshot blocks of the live rows plus whatever was appended meanwhile."""
+        tmp_path = f"{self.path}.compact"
+        try:
+            with self._lock:
+                self._file.flush()
+                offset = os.fstat(self._file.fileno()).st_size
+                values = [[row[column] for column in BOOKING_COLUMNS] for row in self._rows]
+                appended = self._appended
+            # Writers keep appending to the old journal while the snapshot is written
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for start in range(0, len(values), self.SNAPSHOT_BLOCK):
+                    block = values[start:start + self.SNAPSHOT_BLOCK]
+                    f.write(json.dumps({"op": "snapshot", "columns": BOOKING_COLUMNS, "rows": block}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            # Hold off group commits while the file is swapped, then copy the tail and switch over
+            with self._commit:
+                while self._syncing:
+                    self._commit.wait()
+                self._syncing = True
+            swapped = None
+            try:
+                with self._lock:
+                    self._file.flush()
+                    with open(self.path, "rb") as old, open(tmp_path, "ab") as new:
+                        old.seek(offset)
+                        new.write(old.read())
+                        new.flush()
+                        os.fsync(new.fileno())
+                    os.replace(tmp_path, self.path)
+                    _fsync_directory(self.path)
+                    self._file.close()
+                    self._file = open(self.path, "a", encoding="utf-8")
+                    self._since_compaction = self._appended - appended
+                    swapped = self._appended
+            finally:
+                with self._commit:
+                    self._syncing = False
+                    if swapped is not None:
+                        self._synced = max(self._synced, swapped)
+                    self._commit.notify_all()
+        finally:
+            self._compactor = None
+
+    def insert(self, booking):
+        row = _normalize(booking)
+        with self._lock:
+            sequence = self._append([{"op": "insert", "row": row}])
+            self._apply_insert(row)
+        self._durable(sequence)
+
+    def insert_many(self, bookings):
+        rows = [_normalize(booking) for booking in bookings]
+        if not rows:
+            return 0
+        with self._lock:
+            sequence = self._append([{"op": "insert", "row": row} for row in rows])
+            for row in rows:
+                self._apply_insert(row)
+        self._durable(sequence)
+        return len(rows)
+
+    def find_by_email(self, email):
+        with self._lock:
+            positions = self._by_email.get(email)
+            return dict(self._rows[positions[0]]) if positions else None
+
+    def existing_emails(self, emails):
+        with self._lock:
+            return {email for email in emails if email in self._by_email}
+
+    def existing_confirmation_codes(self, codes):
+        with self._lock:
+            return {code for code in codes if code in self._by_code}
+
+    def get(self, booking_id):
+        with self._lock:
+            pos = self._by_id.get(booking_id)
+            return dict(self._rows[pos]) if pos is not None else None
+
+    def find_by_confirmation_code(self, confirmation_code):
+        with self._lock:
+            pos = self._by_code.get(confirmation_code)
+            return dict(self._rows[pos]) if pos is not None else None
+
+    def update_by_email(self, email, new_data):
+        new_data = {k: v for k, v in new_data.items() if k in BOOKING_COLUMNS}
+        with self._lock:
+            if email not in self._by_email:
+                return False
+            sequence = self._append([{"op": "update", "email": email, "data": new_data}])
+            updated = self._apply_update(email, new_data)
+        self._durable(sequence)
+        return updated
+
+    def rows(self):
+        with self._lock:
+            snapshot = [dict(row) for row in self._rows]
+        return iter(snapshot)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def close(self):
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+        with self._lock:
+            self._file.flush()
+            if self.sync:
+                os.fsync(self._file.fileno())
+            self._file.close()
+
+
+def _fsync_directory(path):
+    # Make a rename durable; only POSIX can open a directory for fsync
+    if os.name == "posix":
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class SQLiteBookingStore(BookingStore):
+    """Embedded SQLite booking store with B-tree indexes on the lookup keys.
+
+    With ``shared=True`` several processes can use the same database file: it
+    is switched to WAL mode so readers never block the writer, and
+    ``transaction`` takes SQLite's write lock up front (BEGIN IMMEDIATE), so a
+    read-check-write sequence in one process cannot interleave with another's.
+    ``sync=False`` lets WAL mode skip the fsync on each commit: faster, but the
+    last commits can be lost on power failure.
+    """
+
+    def __init__(self, path, shared=False, sync=True):
+        self.path = path
+        self.shared = shared
+        # Reentrant so store calls made inside transaction() can take it again
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        if shared:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # FULL syncs the WAL on every commit; NORMAL only at checkpoints
+            self._conn.execute(f"PRAGMA synchronous={'FULL' if sync else 'NORMAL'}")
+        columns = ", ".join(
+            f"{c} INTEGER" if c in INTEGER_COLUMNS else f"{c} NUMERIC" if c in NUMERIC_COLUMNS else f"{c} TEXT"
+            for c in BOOKING_COLUMNS
+        )
+        with self._conn:
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS bookings ({columns})")
+            # Tables created before a column was added to BOOKING_COLUMNS get it as an empty column
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(bookings)")}
+            for column in BOOKING_COLUMNS:
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE bookings ADD COLUMN {column} TEXT")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_email ON bookings (email)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_booking_id ON bookings (booking_id)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_confirmation_code ON bookings (confirmation_code)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_date ON bookings (date)")
+        self._insert_sql = (
+            f"INSERT INTO bookings ({', '.join(BOOKING_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in BOOKING_COLUMNS)})"
+        )
+
+    def _values(self, booking):
+        return [booking.get(column) for column in BOOKING_COLUMNS]
+
+    @contextmanager
+    def _writing(self):
+        # Commit on exit unless an enclosing transaction() will
+        if self._depth:
+            yield
+        else:
+            with self._conn:
+                yield
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            if self._depth:
+                self._depth += 1
+                try:
+                    yield
+                finally:
+                    self._depth -= 1
+                return
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._depth = 1
+            try:
+                yield
+            except BaseException:
+                self._conn.rollback()
+                raise
+            else:
+                self._conn.commit()
+            finally:
+                self._depth = 0
+
+    @contextmanager
+    def snapshot(self):
+        with self._lock:
+            if self._depth:
+                # Inside transaction(), whose reads are already consistent
+                yield
+                return
+            # A deferred transaction reads one snapshot and never blocks other processes' writers
+            self._conn.execute("BEGIN")
+            try:
+                yield
+            finally:
+                self._conn.rollback()
+
+    @property
+    def in_transaction(self):
+        # Other threads wait on _lock for the whole transaction, so a nonzero depth seen under it is our own
+        with self._lock:
+            return self._depth > 0
+
+    def data_version(self):
+        """Changes whenever another connection (e.g. another worker process) commits a change."""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def seats_taken(self, first_date, last_date):
+        """Tickets booked per (origin, destination, date, class) for dates in [first_date, last_date].
+
+        Bookings stored without an origin are reported under the origin "".
+        """
+        with self._lock:
+            result = self._conn.execute(
+                "SELECT lower(coalesce(origin, '')), lower(destination), date, lower(ticket_class), SUM(num_tickets) "
+                "FROM bookings "
+                "WHERE date BETWEEN ? AND ? AND destination != '' AND ticket_class != '' AND num_tickets > 0 "
+                "GROUP BY 1, 2, 3, 4",
+                (first_date, last_date)
+            ).fetchall()
+        return {(origin, destination, date, ticket_class): taken
+                for origin, destination, date, ticket_class, taken in result}
+
+    def flight_bookings(self, destination, date, ticket_class, origins=("",)):
+        """(num_tickets, seat_numbers) of every booking on one flight from any of ``origins`` ("" for none stored)."""
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(
+                "SELECT num_tickets, seat_numbers FROM bookings "
+                "WHERE date = ? AND lower(destination) = ? AND lower(ticket_class) = ? AND num_tickets > 0 "
+                f"AND lower(coalesce(origin, '')) IN ({', '.join('?' for _ in origins)})",
+                (date, destination, ticket_class, *origins)
+            )]
+
+    def _fetch_one(self, where, value):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(BOOKING_COLUMNS)} FROM bookings WHERE {where} = ? ORDER BY rowid LIMIT 1",
+                (value,)
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def insert(self, booking):
+        with self._lock, self._writing():
+            self._conn.execute(self._insert_sql, self._values(booking))
+
+    def insert_many(self, bookings):
+        with self._lock, self._writing():
+            cursor = self._conn.executemany(self._insert_sql, (self._values(b) for b in bookings))
+            return cursor.rowcount
+
+    def find_by_email(self, email):
+        return self._fetch_one("email", email)
+
+    def _existing(self, column, values):
+        values = list(set(values))
+        found = set()
+        with self._lock:
+            # Stay well under SQLite's limit on bound parameters per statement
+            for start in range(0, len(values), 500):
+                batch = values[start:start + 500]
+                found.update(row[0] for row in self._conn.execute(
+                    f"SELECT DISTINCT {column} FROM bookings WHERE {column} IN ({', '.join('?' for _ in batch)})", batch
+                ))
+        return found
+
+    def existing_emails(self, emails):
+        return self._existing("email", emails)
+
+    def existing_confirmation_codes(self, codes):
+        return self._existing("confirmation_code", codes)
+
+    def get(self, booking_id):
+        return self._fetch_one("booking_id", booking_id)
+
+    def find_by_confirmation_code(self, confirmation_code):
+        return self._fetch_one("confirmation_code", confirmation_code)
+
+    def update_by_email(self, email, new_data):
+        new_data = {k: v for k, v in new_data.items() if k in BOOKING_COLUMNS}
+        if not new_data:
+            return self.find_by_email(email) is not None
+        assignments = ", ".join(f"{column} = ?" for column in new_data)
+        with self._lock, self._writing():
+            cursor = self._conn.execute(
+                f"UPDATE bookings SET {assignments} WHERE email = ?",
+                [*new_data.values(), email]
+            )
+            return cursor.rowcount > 0
+
+    def rows(self):
+        with self._lock:
+            result = self._conn.execute(f"SELECT {', '.join(BOOKING_COLUMNS)} FROM bookings ORDER BY rowid").fetchall()
+        return (dict(row) for row in result)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM bookings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_store(path, shared=False):
+    """Pick a storage backend from the file extension (.jsonl/.log or SQLite).
+
+    ``shared`` opens the store for use by several processes at once, which
+    only the SQLite backend supports.
+    """
+    if path.endswith((".jsonl", ".log")):
+        if shared:
+            raise ValueError("The JSONL booking log cannot be shared between processes; use a SQLite store")
+        return LogBookingStore(
+            path,
+            sync=os.getenv('FLIGHTLY_JOURNAL_SYNC', '1') == '1',
+            commit_delay=float(os.getenv('FLIGHTLY_GROUP_COMMIT_MS', '0')) / 1000,
+            compact_every=int(os.getenv('FLIGHTLY_JOURNAL_COMPACT_EVERY', '100000'))
+        )
+    return SQLiteBookingStore(path, shared=shared, sync=os.getenv('FLIGHTLY_SQLITE_SYNC', '1') == '1')
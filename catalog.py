@@ -0,0 +1,171 @@
+import json
+from collections import defaultdict
+from datetime import date, datetime
+from operator import attrgetter
+
+TICKET_CLASSES = ("economy", "business", "first")
+ALL_DAYS = frozenset(range(7))
+
+
+class Route:
+    """One scheduled route with per-class fares."""
+
+    __slots__ = ("route_id", "origin", "destination", "airline", "fares", "days", "details")
+
+    def __init__(self, route_id, origin, destination, airline, fares, days=ALL_DAYS, details=None):
+        self.route_id = route_id
+        self.origin = origin
+        self.destination = destination
+        self.airline = airline
+        self.fares = fares
+        self.days = frozenset(days)
+        self.details = details or {}
+
+    def operates_on(self, weekday):
+        return weekday in self.days
+
+    def to_dict(self):
+        return {
+            "route_id": self.route_id,
+            "origin": self.origin,
+            "destination": self.destination,
+            "airline": self.airline,
+            "fares": dict(self.fares),
+            "days": sorted(self.days),
+        }
+
+
+class Offer:
+    """A (route, class) pair and its fare, as returned by catalog searches."""
+
+    __slots__ = ("price", "route", "ticket_class")
+
+    def __init__(self, price, route, ticket_class):
+        self.price = price
+        self.route = route
+        self.ticket_class = ticket_class
+
+    def to_dict(self):
+        return {
+            "origin": self.route.origin,
+            "destination": self.route.destination,
+            "airline": self.route.airline,
+            "ticket_class": self.ticket_class,
+            "price": self.price,
+            "currency": self.route.details.get(self.ticket_class, {}).get("currency"),
+        }
+
+
+def _weekday(day):
+    if day is None:
+        return None
+    if isinstance(day, str):
+        day = datetime.strptime(day, '%Y-%m-%d')
+    if isinstance(day, (date, datetime)):
+        return day.weekday()
+    return int(day)
+
+
+class FlightCatalog:
+    """Routes indexed by origin, destination and weekday.
+
+    Every index entry is a list of fare offers sorted by price; origin and
+    destination lists are also kept per class. A cheapest-fare query walks the narrowest matching
+    list from the cheap end and stops at the first offer that passes the
+    remaining filters, so it never scans the whole catalog.
+    """
+
+    def __init__(self, routes):
+        self.routes = list(routes)
+        offers = defaultdict(list)
+        for route in self.routes:
+            origin = route.origin.lower()
+            destination = route.destination.lower()
+            for ticket_class, price in route.fares.items():
+                offer = Offer(price, route, ticket_class)
+                offers[("origin", origin), None].append(offer)
+                offers[("origin", origin), ticket_class].append(offer)
+                offers[("destination", destination), None].append(offer)
+                offers[("destination", destination), ticket_class].append(offer)
+                # Pair, weekday and catalog-wide lists are not split by class, to keep memory bounded;
+                # pair lists are short, and the broad lists only serve date-only queries
+                offers[("pair", origin, destination), None].append(offer)
+                offers[("all",), None].append(offer)
+                for weekday in route.days:
+                    offers[("day", weekday), None].append(offer)
+        price = attrgetter("price")
+        for offer_list in offers.values():
+            offer_list.sort(key=price)
+        self._offers = dict(offers)
+
+    @classmethod
+    def from_records(cls, records):
+        routes = []
+        for idx, record in enumerate(records):
+            record = dict(record)
+            origin = record.pop("origin")
+            destination = record.pop("destination")
+            airline = record.pop("airline", None)
+            days = record.pop("days", None)
+            fares = {c: record[c]["price"] for c in TICKET_CLASSES if c in record}
+            routes.append(Route(
+                record.pop("route_id", idx), origin, destination,
+                airline or next((record[c].get("airline") for c in fares), None),
+                fares, ALL_DAYS if days is None else days, details=record
+            ))
+        return cls(routes)
+
+    @classmethod
+    def load(cls, path):
+        """Load routes from a JSON ({"routes": [...]}) or Parquet file."""
+        if path.endswith(".parquet"):
+            import pandas as pd
+            return cls.from_records(pd.read_parquet(path).to_dict("records"))
+        with open(path, encoding="utf-8") as f:
+            return cls.from_records(json.load(f)["routes"])
+
+    def _candidates(self, origin, destination, weekday, ticket_class):
+        if origin and destination:
+            key = ("pair", origin.lower(), destination.lower())
+        elif destination:
+            key = ("destination", destination.lower())
+        elif origin:
+            key = ("origin", origin.lower())
+        elif weekday is not None:
+            key = ("day", weekday)
+        else:
+            key = ("all",)
+        if key[0] in ("origin", "destination"):
+            return self._offers.get((key, ticket_class), [])
+        return self._offers.get((key, None), [])
+
+    def search(self, origin=None, destination=None, ticket_class=None, day=None, limit=10, predicate=None):
+        """Cheapest offers matching the filters, in price order.
+
+        ``day`` is a date, a YYYY-MM-DD string or a weekday number; ``predicate``
+        is an optional extra check (e.g. seat availability) applied to each offer.
+        """
+        weekday = _weekday(day)
+        ticket_class = ticket_class and ticket_class.lower()
+        results = []
+        for offer in self._candidates(origin, destination, weekday, ticket_class):
+            if ticket_class and offer.ticket_class != ticket_class:
+                continue
+            if weekday is not None and weekday not in offer.route.days:
+                continue
+            if predicate is not None and not predicate(offer):
+                continue
+            results.append(offer)
+            if len(results) >= limit:
+                break
+        return results
+
+    def cheapest(self, origin=None, destination=None, ticket_class=None, day=None, predicate=None):
+        offers = self.search(origin, destination, ticket_class, day, limit=1, predicate=predicate)
+        return offers[0] if offers else None
+
+    def destinations(self):
+        return sorted({key[1] for key, ticket_class in self._offers if key[0] == "destination" and ticket_class is None})
+
+    def __len__(self):
+        return len(self.routes)
@@ -0,0 +1,181 @@
+import re
+from bisect import bisect_right
+
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+VALID_EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+PHONE_PATTERN = re.compile(r'\b\d{10}\b')
+PASSPORT_PATTERN = re.compile(r'\b[A-Z0-9]{6,9}\b')  # matched against the upper-cased message
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+NUM_TICKETS_PATTERN = re.compile(r'\b(\d+)\s+(?:ticket|tickets|seat|seats)\b')  # matched against the lower-cased message
+
+DIGIT_PATTERN = re.compile(r'\d')
+
+# Joins messages for batch extraction; no pattern or keyword can match across it
+_SEPARATOR = "\x00"
+
+
+def _trie_pattern(words):
+    """Regex alternation factored by common prefixes, e.g. veg(?:an|etarian)."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = f"(?:{'|'.join(branches)})"
+        return group + "?" if "" in node else group
+
+    return build(trie)
+
+
+class BookingExtractor:
+    """Pulls booking details out of chat messages in a single scan per pattern.
+
+    All vocabulary keywords (cities, classes, seat locations, meal types) are
+    found with one prefix-factored regex, so the cost of a scan grows with the
+    message length rather than the vocabulary size. The alternation sits in a
+    lookahead so overlapping keywords such as "vegetarian" inside
+    "non-vegetarian" are all reported, matching plain substring checks.
+    """
+
+    def __init__(self, cities, classes, seat_locations, meal_types, origins=()):
+        self.cities = [c.lower() for c in cities]
+        self.origins = sorted({o.lower() for o in origins})
+        # "from <city>" names the route's origin; only cities that routes depart from are matched
+        self._origin_pattern = (
+            re.compile(rf"\bfrom\s+({_trie_pattern(self.origins)})\b") if self.origins else None
+        )
+        self.classes = [c.lower() for c in classes]
+        self.seat_locations = [s.lower() for s in seat_locations]
+        self.meal_types = [m.lower() for m in meal_types]
+        keywords = set(self.cities + self.classes + self.seat_locations + self.meal_types)
+        first_chars = re.escape("".join(sorted({k[0] for k in keywords})))
+        # The leading character class lets the engine skip positions that cannot start a keyword
+        self._keyword_pattern = re.compile(f"(?=[{first_chars}])(?=({_trie_pattern(keywords)}))")
+        # The lookahead reports one keyword per position, so a match also implies any keyword that is its prefix
+        self._implied = {}
+        for k in keywords:
+            prefixes = [other for other in keywords if other != k and k.startswith(other)]
+            if prefixes:
+                self._implied[k] = prefixes
+        self._vocabularies = [
+            ("destination", self.cities),
+            ("ticket_class", self.classes),
+            ("seat_location", self.seat_locations),
+        ]
+        self._roles = {k: [] for k in keywords}
+        for field, vocabulary in self._vocabularies:
+            for rank, keyword in enumerate(vocabulary):
+                self._roles[keyword].append((field, rank))
+
+    @classmethod
+    def from_flight_db(cls, flight_db):
+        return cls(
+            cities=flight_db.flights.keys(),
+            classes=["economy", "business", "first"],
+            seat_locations=flight_db.seat_preferences["location"],
+            meal_types=flight_db.meal_options["regular"] + flight_db.meal_options["special"],
+            origins=[origin for origin, _ in flight_db.routes],
+        )
+
+    def _fields(self, email, phone, passport, date, num_tickets, keywords, origin=None):
+        fields = {}
+        if email:
+            fields["email"] = email
+        if phone:
+            fields["phone"] = phone
+        if passport:
+            fields["passport"] = passport
+        if date:
+            fields["date"] = date
+        if num_tickets:
+            fields["num_tickets"] = int(num_tickets)
+        if origin:
+            fields["origin"] = origin
+            # The city a flight leaves from is not its destination
+            keywords.discard(origin)
+        if not keywords:
+            return fields
+        for keyword in keywords & self._implied.keys():
+            keywords.update(self._implied[keyword])
+        # Each field takes the keyword that comes first in its vocabulary, as the substring loops did
+        best = {}
+        for keyword in keywords:
+            for field, rank in self._roles[keyword]:
+                if rank < best.get(field, rank + 1):
+                    best[field] = rank
+        for field, vocabulary in self._vocabularies:
+            if field in best:
+                fields[field] = vocabulary[best[field]]
+        meals = [meal for meal in self.meal_types if meal in keywords]
+        if meals:
+            fields["meal_preferences"] = meals
+        return fields
+
+    def extract(self, message):
+        """Return the booking fields found in one message (the date is not validated)."""
+        lower = message.lower()
+        # Cheap prefilters: skip patterns whose mandatory characters are absent
+        has_digit = DIGIT_PATTERN.search(message) is not None
+        email = EMAIL_PATTERN.search(message) if "@" in message else None
+        phone = PHONE_PATTERN.search(message) if has_digit else None
+        passport = PASSPORT_PATTERN.search(message.upper())
+        date = DATE_PATTERN.search(message) if has_digit and "-" in message else None
+        num_tickets = NUM_TICKETS_PATTERN.search(lower) if has_digit else None
+        origin = self._origin_pattern.search(lower) if self._origin_pattern and "from" in lower else None
+        return self._fields(
+            email and email.group(0),
+            phone and phone.group(0),
+            passport and passport.group(0),
+            date and date.group(0),
+            num_tickets and num_tickets.group(1),
+            set(self._keyword_pattern.findall(lower)),
+            origin and origin.group(1),
+        )
+
+    def extract_many(self, messages):
+        """Extract fields from many messages with one scan per pattern over the whole batch."""
+        messages = list(messages)
+        if not messages:
+            return []
+        starts = []
+        offset = 0
+        for message in messages:
+            starts.append(offset)
+            offset += len(message) + len(_SEPARATOR)
+        text = _SEPARATOR.join(messages)
+        lower = text.lower()
+        upper = text.upper()
+        if len(lower) != len(text) or len(upper) != len(text):
+            # Case mapping changed the length (e.g. "ß" -> "SS"), so offsets no longer line up
+            return [self.extract(message) for message in messages]
+
+        def first_matches(pattern, haystack, group=0):
+            found = [None] * len(messages)
+            for match in pattern.finditer(haystack):
+                idx = bisect_right(starts, match.start()) - 1
+                if found[idx] is None:
+                    found[idx] = match.group(group)
+            return found
+
+        emails = first_matches(EMAIL_PATTERN, text)
+        phones = first_matches(PHONE_PATTERN, text)
+        passports = first_matches(PASSPORT_PATTERN, upper)
+        dates = first_matches(DATE_PATTERN, text)
+        num_tickets = first_matches(NUM_TICKETS_PATTERN, lower, group=1)
+        origins = first_matches(self._origin_pattern, lower, group=1) if self._origin_pattern else [None] * len(messages)
+        keywords = [set() for _ in messages]
+        for match in self._keyword_pattern.finditer(lower):
+            keywords[bisect_right(starts, match.start()) - 1].add(match.group(1))
+
+        return [
+            self._fields(emails[i], phones[i], passports[i], dates[i], num_tickets[i], keywords[i], origins[i])
+            for i in range(len(messages))
+        ]
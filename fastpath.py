@@ -0,0 +1,219 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Lookup intents that can be answered straight from the flight database, in answer order
+INTENT_PATTERNS = [
+    ("price", re.compile(r"\b(?:price|prices|cost|costs|fare|fares|how much (?:is|are|does|do|for)|cheapest|cheap)\b")),
+    ("airline", re.compile(r"\b(?:airline|airlines|carrier|operated by)\b")),
+    ("duration", re.compile(r"\b(?:how long|duration|flight time|hours)\b")),
+    ("baggage", re.compile(r"\b(?:baggage|luggage|bags?|carry-ons?|checked)\b")),
+    ("dates", re.compile(r"\b(?:available dates|which dates|what dates|availability|when can i)\b")),
+]
+# Balance questions are answered from the loyalty ledger once the customer's email is known
+BALANCE_PATTERN = re.compile(
+    r"\b(?:my (?:loyalty )?(?:points|miles|balance)|(?:points|loyalty) balance|how many (?:loyalty )?points (?:do i|have i))\b"
+)
+# Only questions take the fast path; statements made mid-booking ("I have 2 checked bags") go to the model
+QUESTION_PATTERN = re.compile(
+    r"\?|^\s*(?:what|which|how|when|where|who|why|is|are|does|do|can|could|will|would|should|tell me)\b"
+)
+# Cached model answers about these depend on seat counts, not only on the catalog
+SEATS_PATTERN = re.compile(r"\b(?:seats?|dates?|availab\w*|sold out|full|left|when)\b")
+# A session has a saved booking once these are known; the assistant stores it on every turn after that
+BOOKED_FIELDS = ("email", "destination", "date")
+# Messages that do something (book, change, cancel) always go to the model
+ACTION_PATTERN = re.compile(r"\b(?:book|reserve|change|cancel|update|confirm|upgrade)\b")
+_NORMALIZE_PATTERN = re.compile(r"[^a-z0-9@.\-]+")
+
+
+def normalize_question(message):
+    return _NORMALIZE_PATTERN.sub(" ", message.lower()).strip()
+
+
+class ResponseCache:
+    """LRU cache of normalized question -> model answer with a TTL.
+
+    Each entry records the flight data version it was produced under, and a
+    lookup under a different version is a miss, so answers never outlive the
+    data they depend on. FastPath versions seat and date answers by catalog
+    and inventory, and everything else by the catalog alone.
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=3600, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            answer, entry_version, expires = entry
+            if entry_version != version or expires < self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return answer
+
+    def put(self, key, version, answer):
+        with self._lock:
+            self._entries[key] = (answer, version, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FastPath:
+    """Answers deterministic flight-info questions without calling the model.
+
+    Price, airline, duration, baggage and available-date questions naming a
+    known destination are answered from the FlightDatabase, and balance
+    questions from the loyalty ledger once the customer's email is known. Other opening
+    questions asked with no conversation context are served from a
+    ResponseCache of earlier model answers.
+    """
+
+    def __init__(self, flight_db, cache=None, ledger=None):
+        self.flight_db = flight_db
+        self.cache = cache if cache is not None else ResponseCache()
+        self.ledger = ledger
+        self._lock = threading.Lock()
+        self.database_hits = 0
+        self.cache_hits = 0
+        self.misses = 0
+        self.model_seconds = 0.0
+
+    def detect_intents(self, message):
+        lower = message.lower()
+        if ACTION_PATTERN.search(lower) or not QUESTION_PATTERN.search(lower):
+            return []
+        return [intent for intent, pattern in INTENT_PATTERNS if pattern.search(lower)]
+
+    def _cacheable(self, message, fields, history, fresh_session):
+        # Only context-free questions: no earlier turns, no booking state yet, nothing personal, no action
+        if not fresh_session or history or {"email", "phone", "date", "num_tickets"} & fields.keys():
+            return False
+        return ACTION_PATTERN.search(message.lower()) is None
+
+    def answer(self, message, fields, booking, history, fresh_session):
+        """Return a reply for ``message`` without the model, or None to fall through."""
+        reply = self._answer_balance(message, booking)
+        if reply is None and not ({"email", "phone"} & fields.keys()):
+            reply = self._answer_from_database(message, fields, booking)
+        if reply is not None:
+            with self._lock:
+                self.database_hits += 1
+            return reply
+        if self._cacheable(message, fields, history, fresh_session):
+            reply = self.cache.get(normalize_question(message), self._cache_version(message))
+            if reply is not None:
+                with self._lock:
+                    self.cache_hits += 1
+                return reply
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def remember(self, message, fields, history, fresh_session, reply, model_seconds):
+        """Record a model answer (and how long it took) after a miss."""
+        with self._lock:
+            self.model_seconds += model_seconds
+        if self._cacheable(message, fields, history, fresh_session):
+            self.cache.put(normalize_question(message), self._cache_version(message), reply)
+
+    def _cache_version(self, message):
+        # Prices, airlines, durations and baggage only change with the catalog; answers about
+        # seats or dates also expire when any seat count changes
+        if SEATS_PATTERN.search(message.lower()):
+            return self.flight_db.data_version
+        return self.flight_db.catalog_version
+
+    def _answer_balance(self, message, booking):
+        email = booking.get("email")
+        lower = message.lower()
+        if self.ledger is None or not email or not BALANCE_PATTERN.search(lower) or not QUESTION_PATTERN.search(lower):
+            return None
+        return (f"Your loyalty balance is {self.ledger.balance(email)} points. "
+                f"Every booking earns points worth 10% of its total price.")
+
+    def _answer_from_database(self, message, fields, booking):
+        intents = self.detect_intents(message)
+        # Only a destination named in this message; one carried over from the booking would
+        # turn any question mid-booking into a lookup
+        destination = fields.get("destination")
+        if not intents or not destination:
+            return None
+        route = self.flight_db.route_key(destination, fields.get("origin"))
+        flight = self.flight_db.routes.get(route)
+        if flight is None:
+            return None
+        city = destination.title()
+        ticket_class = fields.get("ticket_class")
+        if ticket_class is None and "cheapest" in message.lower():
+            offer = self.flight_db.cheapest_flight(destination)
+            ticket_class = offer.ticket_class if offer else None
+        ticket_class = ticket_class or booking.get("ticket_class") or "economy"
+        details = flight.get(ticket_class, {})
+
+        lines = []
+        for intent in intents:
+            # A route without the fields an answer needs falls through to the model
+            if intent == "price":
+                price, currency = details.get("price"), details.get("currency")
+                if price is None or currency is None:
+                    return None
+                article = "An" if ticket_class[0] in "aeiou" else "A"
+                lines.append(f"{article} {ticket_class} class ticket to {city} from {flight['source_city']} costs "
+                             f"{price} {currency}.")
+            elif intent == "airline":
+                airline, flight_type = details.get("airline"), details.get("flight_type")
+                if airline is None or flight_type is None:
+                    return None
+                lines.append(f"Flights to {city} are operated by {airline} ({flight_type}).")
+            elif intent == "duration":
+                duration, flight_type = details.get("duration"), details.get("flight_type")
+                if duration is None or flight_type is None:
+                    return None
+                lines.append(f"The flight to {city} takes {duration} ({flight_type}).")
+            elif intent == "baggage":
+                baggage = details.get("baggage")
+                if baggage is None:
+                    return None
+                lines.append(f"{ticket_class.title()} class to {city} includes {baggage}.")
+            elif intent == "dates":
+                dates = self.flight_db.get_available_dates(route, ticket_class)
+                if dates:
+                    lines.append(f"{ticket_class.title()} seats to {city} are available on {len(dates)} dates "
+                                 f"between {dates[0]} and {dates[-1]}.")
+                else:
+                    lines.append(f"There are no {ticket_class} seats to {city} left in the booking window.")
+        if not all(booking.get(field) for field in BOOKED_FIELDS):
+            lines.append("Would you like to proceed with booking?")
+        return " ".join(lines)
+
+    def stats(self):
+        """Hit counts, hit rate and estimated model time saved (mean miss latency x hits)."""
+        with self._lock:
+            hits = self.database_hits + self.cache_hits
+            total = hits + self.misses
+            mean_model = self.model_seconds / self.misses if self.misses else 0.0
+            return {
+                "database_hits": self.database_hits,
+                "cache_hits": self.cache_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0,
+                "model_seconds_saved": hits * mean_model,
+                "cache_entries": len(self.cache),
+            }
@@ -0,0 +1,247 @@
+import os
+import time
+from datetime import date, datetime
+from catalog import FlightCatalog
+from inventory import SeatInventory
+from seatmap import SeatMap
+
+def parse_date(date_str):
+    """Parse a strict YYYY-MM-DD string into a date, or return None."""
+    if not isinstance(date_str, str) or len(date_str) != 10 or date_str[4] != '-' or date_str[7] != '-':
+        return None
+    try:
+        return date.fromisoformat(date_str)
+    except ValueError:
+        return None
+
+class FlightDatabase:
+    def __init__(self, horizon_days=None):
+        self.meal_options = {
+            "regular": ["vegetarian", "non-vegetarian", "vegan", "halal", "kosher"],
+            "special": ["diabetic", "gluten-free", "low-sodium", "low-fat"]
+        }
+        self.seat_preferences = {
+            "location": ["window", "aisle", "middle"],
+            "section": ["front", "middle", "back"],
+            "special": ["extra legroom", "bassinet", "wheelchair accessible"]
+        }
+        # Routes come from the flight catalog data file (data/flights.json by default)
+        catalog_file = os.getenv('FLIGHTLY_CATALOG', os.path.join(os.path.dirname(__file__), 'data', 'flights.json'))
+        self.catalog = FlightCatalog.load(catalog_file)
+        # Fares, seat counts and seat numbers are kept per route, keyed by (origin, destination) in lower case
+        self.routes, self.default_routes = self._route_flights()
+        # One entry per destination (its first listed route), for callers that only know the destination
+        self.flights = {city: self.routes[route] for city, route in self.default_routes.items()}
+        # Bump when fares are changed in place; cached answers are keyed on it
+        self.catalog_version = 0
+        self.seat_capacity = {"economy": 100, "business": 20, "first": 10}
+        self.horizon_days = horizon_days or int(os.getenv('FLIGHTLY_BOOKING_HORIZON', '30'))
+        self.inventory = self._initialize_seats()
+        # Seat numbers per flight and date, laid out from each route's seat_config
+        self.seat_map = SeatMap.from_flights(self.routes)
+        # Set by follow() when other processes book against the same store
+        self._shared_store = None
+        
+    @property
+    def date_range(self):
+        self._roll_window()
+        return {
+            "min_date": datetime.combine(self.inventory.first_day, datetime.min.time()),
+            "max_date": datetime.combine(self.inventory.last_day, datetime.min.time())
+        }
+        
+    @property
+    def data_version(self):
+        """Changes whenever a price or a seat count changes."""
+        self._roll_window(follow=True)
+        return self.catalog_version, self.inventory.version
+
+    def _route_flights(self):
+        # A booking names its route by origin and destination, so each city pair may be listed once
+        routes = {}
+        defaults = {}
+        for route in self.catalog.routes:
+            key = (route.origin.lower(), route.destination.lower())
+            if key in routes:
+                raise ValueError(f"Catalog lists the route {route.origin!r} to {route.destination!r} twice")
+            routes[key] = {"source_city": route.origin, **route.details}
+            defaults.setdefault(key[1], key)
+        return routes, defaults
+
+    def route_key(self, city, origin=None):
+        """The (origin, destination) key of a route, or of the destination's first listed route without ``origin``.
+
+        ``city`` may already be a route key. Unknown routes still get a key,
+        which no flight holds seats or fares for.
+        """
+        if isinstance(city, tuple):
+            return city
+        city = city.lower()
+        if origin:
+            return origin.lower(), city
+        return self.default_routes.get(city, ("", city))
+
+    def _initialize_seats(self):
+        return SeatInventory(
+            routes=list(self.routes),
+            classes=list(self.seat_capacity),
+            capacity=self.seat_capacity,
+            horizon_days=self.horizon_days,
+            start_day=date.today()
+        )
+    
+    def _roll_window(self, follow=False):
+        # Cheap when the day has not changed; otherwise expires past days and opens new ones
+        today = date.today()
+        if self.inventory.advance(today):
+            self.seat_map.drop_before(today)
+        # Only answers follow the store: bookings reload their own flights, and a reload in the middle of
+        # one would drop seats it has reserved but not yet written
+        if follow and self._shared_store is not None:
+            self._follow_store()
+
+    def follow(self, store, interval=1.0):
+        """Keep seat counts in step with bookings that other processes write to a shared ``store``.
+
+        At most once per ``interval`` seconds, and only when another process
+        has committed since the last check, the window's counts are reloaded
+        from the store. Bookings themselves reload the flights they touch
+        first (``load_flight``), so stale counts only affect answers, never
+        reservations. Counts are only reloaded for availability answers, and
+        never while a booking transaction in this process is open.
+        """
+        self._shared_store = store
+        self._follow_interval = interval
+        self._next_follow = 0.0
+        self._store_version = None
+
+    def _follow_store(self):
+        now = time.monotonic()
+        if now < self._next_follow:
+            return
+        store = self._shared_store
+        # The snapshot also waits out other threads' booking transactions, so their reservations are written first
+        with store.snapshot():
+            if store.in_transaction:
+                return
+            self._next_follow = now + self._follow_interval
+            version = store.data_version()
+            if version == self._store_version:
+                return
+            self._store_version = version
+            taken = store.seats_taken(self.inventory.first_day.isoformat(), self.inventory.last_day.isoformat())
+            by_day = {}
+            for (origin, city, date_str, ticket_class), n in taken.items():
+                day = parse_date(date_str)
+                if day is not None:
+                    # Bookings stored before routes were recorded have no origin and hold the default route
+                    key = self.route_key(city, origin), day, ticket_class
+                    by_day[key] = by_day.get(key, 0) + n
+            self.inventory.load_taken(by_day)
+
+    def stored_origins(self, route):
+        """Origins a stored booking on ``route`` may carry: its own, plus none for a destination's default route."""
+        route = self.route_key(route)
+        return (route[0], "") if self.default_routes.get(route[1]) == route else (route[0],)
+
+    def load_flight(self, city, date_str, ticket_class, taken, seats, origin=None):
+        """Set one flight's seat count and seat map from ``taken`` tickets and ``seats`` labels held."""
+        day = parse_date(date_str)
+        if day is None:
+            return
+        self._roll_window()
+        route, ticket_class = self.route_key(city, origin), ticket_class.lower()
+        self.inventory.set_taken(route, day, ticket_class, taken)
+        self.seat_map.load(route, day, ticket_class, seats)
+    
+    def check_availability(self, city, date_str, ticket_class, origin=None):
+        day = parse_date(date_str)
+        if day is None:
+            return 0
+        self._roll_window(follow=True)
+        return self.inventory.available(self.route_key(city, origin), day, ticket_class.lower())
+    
+    def reserve(self, city, date_str, ticket_class, num_seats, origin=None):
+        """Atomically hold seats on a flight; returns False if not enough are left."""
+        day = parse_date(date_str)
+        if day is None:
+            return False
+        self._roll_window()
+        return self.inventory.reserve(self.route_key(city, origin), day, ticket_class.lower(), num_seats)
+    
+    def release(self, city, date_str, ticket_class, num_seats, origin=None):
+        """Give previously reserved seats back to the flight."""
+        day = parse_date(date_str)
+        if day is None:
+            return False
+        self._roll_window()
+        return self.inventory.release(self.route_key(city, origin), day, ticket_class.lower(), num_seats)
+    
+    def assign_seats(self, city, date_str, ticket_class, num_seats, preferences=None, origin=None):
+        """Pick seat numbers for a party, seated together where possible; [] if none could be assigned."""
+        day = parse_date(date_str)
+        if day is None:
+            return []
+        return self.seat_map.assign(self.route_key(city, origin), day, ticket_class.lower(), num_seats, preferences)
+    
+    def reassign_seats(self, city, date_str, ticket_class, seats, num_seats, preferences=None, origin=None):
+        """Move a party holding ``seats`` to ``num_seats`` seats on the same flight; [] if they do not fit."""
+        day = parse_date(date_str)
+        if day is None:
+            return []
+        return self.seat_map.reassign(self.route_key(city, origin), day, ticket_class.lower(), seats, num_seats,
+                                      preferences)
+    
+    def hold_seats(self, city, date_str, ticket_class, seats, origin=None):
+        """Mark already assigned seat numbers as taken (used when reloading bookings)."""
+        day = parse_date(date_str)
+        return day is not None and self.seat_map.hold(self.route_key(city, origin), day, ticket_class.lower(), seats)
+    
+    def release_seats(self, city, date_str, ticket_class, seats, origin=None):
+        day = parse_date(date_str)
+        if day is not None:
+            self.seat_map.release(self.route_key(city, origin), day, ticket_class.lower(), seats)
+    
+    def get_price(self, city, ticket_class, origin=None):
+        route = self.route_key(city, origin)
+        ticket_class = ticket_class.lower()
+        return self.routes.get(route, {}).get(ticket_class, {}).get('price', None)
+    
+    def search_flights(self, origin=None, destination=None, ticket_class=None, date_str=None, limit=10):
+        """Cheapest catalog offers matching the filters, in price order."""
+        return self.catalog.search(origin, destination, ticket_class, date_str, limit=limit)
+    
+    def cheapest_flight(self, destination=None, origin=None, ticket_class=None, date_str=None):
+        """Cheapest offer across all classes and dates unless narrowed by the filters."""
+        return self.catalog.cheapest(origin, destination, ticket_class, date_str)
+    
+    def is_valid_date(self, date_str):
+        day = parse_date(date_str)
+        if day is None:
+            return False, "Invalid date format. Use YYYY-MM-DD"
+        self._roll_window()
+        if day < self.inventory.first_day:
+            return False, "Cannot book for past dates"
+        if day > self.inventory.last_day:
+            return False, f"Bookings only available within next {self.horizon_days} days (until {self.inventory.last_day.isoformat()})"
+        return True, "Date is valid"
+    
+    def get_available_dates(self, city, ticket_class='economy', num_seats=1, origin=None):
+        self._roll_window(follow=True)
+        days = self.inventory.days_with_seats(self.route_key(city, origin), ticket_class.lower(), num_seats)
+        return [day.isoformat() for day in days]
+    
+    def availability_matrix(self, ticket_class=None, start_date=None, end_date=None):
+        """Seat counts for every route over [start_date, end_date] in one array.
+
+        Returns (routes, dates, matrix) where routes are (origin, destination)
+        keys and matrix is [route, date] for one class or [route, date, class]
+        when ticket_class is None.
+        """
+        self._roll_window(follow=True)
+        days, matrix = self.inventory.availability_matrix(
+            ticket_class and ticket_class.lower(),
+            parse_date(start_date) if start_date else None,
+            parse_date(end_date) if end_date else None
+        )
+        return self.inventory.routes, [day.isoformat() for day in days], matrix
@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+
+# Crockford base32: no I, L, O or U, and the digits sort in the same order as the values
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODE = {ch: value for value, ch in enumerate(ALPHABET)}
+ID_LENGTH = 13  # 13 base32 digits hold any 64-bit value
+
+EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+NODE_BITS = 10
+SEQUENCE_BITS = 12
+MAX_NODE = (1 << NODE_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+_MASK64 = (1 << 64) - 1
+
+
+# Two base32 digits per 10-bit chunk, to halve the work per encoded ID
+_PAIRS = [ALPHABET[i >> 5] + ALPHABET[i & 31] for i in range(1024)]
+
+
+def encode(value, length=ID_LENGTH):
+    """Fixed-width base32 text, so string order matches numeric order."""
+    pairs, single = divmod(length, 2)
+    head = ALPHABET[(value >> (10 * pairs)) & 31] if single else ""
+    return head + "".join([_PAIRS[(value >> shift) & 1023] for shift in range(10 * pairs - 10, -1, -10)])
+
+
+def decode(text):
+    value = 0
+    for ch in text.upper():
+        value = value * 32 + _DECODE[ch]
+    return value
+
+
+def scramble(value):
+    """Bijective 64-bit mix (the splitmix64 finalizer): distinct inputs always give distinct outputs."""
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def default_node_id():
+    """Node ID from FLIGHTLY_NODE_ID, else derived from the process ID."""
+    node = os.getenv('FLIGHTLY_NODE_ID')
+    return int(node) if node else os.getpid() & MAX_NODE
+
+
+class BookingIdGenerator:
+    """Snowflake-style 63-bit IDs: milliseconds since 2024, node ID, sequence.
+
+    IDs from one generator are strictly increasing, and generators with
+    different node IDs never produce the same ID, so processes that share a
+    booking store only need distinct ``node_id`` values (0-1023). Each node
+    can issue 4096 IDs per millisecond. A burst past that, or a clock that
+    steps backwards, borrows the following milliseconds instead of waiting
+    or repeating.
+    """
+
+    def __init__(self, node_id=None, clock=time.time_ns):
+        self.node_id = default_node_id() if node_id is None else node_id
+        if not 0 <= self.node_id <= MAX_NODE:
+            raise ValueError(f"node_id must be between 0 and {MAX_NODE}")
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _now_ms(self):
+        return self._clock() // 1_000_000 - EPOCH_MS
+
+    def next_id(self):
+        with self._lock:
+            now = self._now_ms()
+            if now > self._last_ms:
+                self._last_ms, self._sequence = now, 0
+            elif self._sequence > MAX_SEQUENCE:
+                self._last_ms, self._sequence = self._last_ms + 1, 0
+            sequence = self._sequence
+            self._sequence = sequence + 1
+            return (self._last_ms << (NODE_BITS + SEQUENCE_BITS)) | (self.node_id << SEQUENCE_BITS) | sequence
+
+    def next_ids(self, count):
+        """Reserve ``count`` consecutive IDs under a single lock acquisition."""
+        ids = []
+        with self._lock:
+            now = self._now_ms()
+            if now > self._last_ms:
+                self._last_ms, self._sequence = now, 0
+            while count > 0:
+                if self._sequence > MAX_SEQUENCE:
+                    self._last_ms, self._sequence = self._last_ms + 1, 0
+                take = min(count, MAX_SEQUENCE + 1 - self._sequence)
+                base = (self._last_ms << (NODE_BITS + SEQUENCE_BITS)) | (self.node_id << SEQUENCE_BITS)
+                ids.extend(range(base + self._sequence, base + self._sequence + take))
+                self._sequence += take
+                count -= take
+        return ids
+
+
+def parse_id(value):
+    """Split an ID into (unix milliseconds, node ID, sequence)."""
+    return (
+        (value >> (NODE_BITS + SEQUENCE_BITS)) + EPOCH_MS,
+        (value >> SEQUENCE_BITS) & MAX_NODE,
+        value & MAX_SEQUENCE,
+    )
@@ -0,0 +1,190 @@
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+
+
+class SeatInventory:
+    """Seat counts for a rolling window of real dates, in a dense NumPy array.
+
+    The array is indexed by [route, day_slot, class], where the slot of a date
+    is ``date.toordinal() % horizon_days``. The slots form a ring buffer:
+    moving the window forward by one day resets the expired day's slot to full
+    capacity, and that slot becomes the new last day. No other day is touched
+    and nothing is reallocated.
+
+    Single-flight updates are atomic under striped locks: each (route, slot,
+    class) maps to one of ``lock_stripes`` locks, so bookings on different
+    flights rarely contend and there is no global lock. A reservation is a
+    check-and-decrement under its stripe lock. Calendar-style questions are
+    answered with one vectorized call over the whole array.
+    """
+
+    def __init__(self, routes, classes, capacity, horizon_days=30, start_day=None,
+                 lock_stripes=1024):
+        self.routes = list(routes)
+        self.classes = list(classes)
+        self.horizon_days = horizon_days
+        self._route_index = {route: i for i, route in enumerate(self.routes)}
+        self._class_index = {ticket_class: i for i, ticket_class in enumerate(self.classes)}
+        shape = (len(self.routes), horizon_days, len(self.classes))
+        self.capacity = np.array([capacity[c] for c in self.classes], dtype=np.int32)
+        self.seats = np.empty(shape, dtype=np.int32)
+        self.seats[:] = self.capacity
+        # Flat view shares memory with the 3-D array and makes scalar access cheaper
+        self._seats_flat = self.seats.reshape(-1)
+        self._locks = [threading.Lock() for _ in range(max(1, min(lock_stripes, self.seats.size)))]
+        self._advance_lock = threading.Lock()
+        self.first_ordinal = (start_day or date.today()).toordinal()
+        # Bumped on every change to any seat count, so callers can tell when cached answers are stale.
+        # Writers on different stripes bump it concurrently, so it has its own lock
+        self.version = 0
+        self._version_lock = threading.Lock()
+
+    def _bump_version(self):
+        with self._version_lock:
+            self.version += 1
+
+    @property
+    def first_day(self):
+        return date.fromordinal(self.first_ordinal)
+
+    @property
+    def last_day(self):
+        return date.fromordinal(self.first_ordinal + self.horizon_days - 1)
+
+    def advance(self, today):
+        """Move the window so it starts at ``today``; costs O(days elapsed), not O(horizon)."""
+        ordinal = today.toordinal()
+        if ordinal <= self.first_ordinal:
+            return 0
+        with self._advance_lock:
+            expired = ordinal - self.first_ordinal
+            if expired <= 0:
+                return 0
+            # Hold every stripe so no reservation commits into a slot while it changes date
+            for lock in self._locks:
+                lock.acquire()
+            try:
+                if expired >= self.horizon_days:
+                    self.seats[:] = self.capacity
+                else:
+                    for old in range(self.first_ordinal, ordinal):
+                        slot = old % self.horizon_days
+                        self.seats[:, slot, :] = self.capacity
+                self.first_ordinal = ordinal
+                self._bump_version()
+            finally:
+                for lock in self._locks:
+                    lock.release()
+            return expired
+
+    def _in_window(self, ordinal):
+        return self.first_ordinal <= ordinal < self.first_ordinal + self.horizon_days
+
+    def _slot(self, city, day, ticket_class):
+        route = self._route_index.get(city)
+        cls = self._class_index.get(ticket_class)
+        ordinal = day.toordinal()
+        if route is None or cls is None or not self._in_window(ordinal):
+            return None, ordinal
+        return (route * self.horizon_days + ordinal % self.horizon_days) * len(self.classes) + cls, ordinal
+
+    def available(self, city, day, ticket_class):
+        slot, _ = self._slot(city, day, ticket_class)
+        return self._seats_flat.item(slot) if slot is not None else 0
+
+    def reserve(self, city, day, ticket_class, n):
+        """Atomically take ``n`` seats; returns False if they are not available."""
+        slot, ordinal = self._slot(city, day, ticket_class)
+        if slot is None or n <= 0:
+            return False
+        with self._locks[slot % len(self._locks)]:
+            if not self._in_window(ordinal) or self._seats_flat.item(slot) < n:
+                return False
+            self._seats_flat[slot] -= n
+            self._bump_version()
+        return True
+
+    def release(self, city, day, ticket_class, n):
+        """Return ``n`` previously reserved seats to the pool."""
+        slot, ordinal = self._slot(city, day, ticket_class)
+        if slot is None or n <= 0:
+            return False
+        with self._locks[slot % len(self._locks)]:
+            if not self._in_window(ordinal):
+                return False
+            self._seats_flat[slot] += n
+            self._bump_version()
+        return True
+
+    def set_taken(self, city, day, ticket_class, taken):
+        """Overwrite one flight's count with ``taken`` seats sold (e.g. as read from a shared store)."""
+        slot, ordinal = self._slot(city, day, ticket_class)
+        if slot is None:
+            return False
+        capacity = self.capacity.item(slot % len(self.classes))
+        with self._locks[slot % len(self._locks)]:
+            if not self._in_window(ordinal):
+                return False
+            self._seats_flat[slot] = capacity - taken
+            self._bump_version()
+        return True
+
+    def load_taken(self, taken):
+        """Reset every flight in the window to capacity minus ``taken`` {(city, day, class): seats sold}."""
+        seats = np.empty_like(self.seats)
+        seats[:] = self.capacity
+        seats_flat = seats.reshape(-1)
+        with self._advance_lock:
+            for lock in self._locks:
+                lock.acquire()
+            try:
+                for (city, day, ticket_class), n in taken.items():
+                    slot, _ = self._slot(city, day, ticket_class)
+                    if slot is not None:
+                        seats_flat[slot] -= n
+                self.seats[:] = seats
+                self._bump_version()
+            finally:
+                for lock in self._locks:
+                    lock.release()
+
+    def _slots_in_order(self, start=0, stop=None):
+        # Ring slots for window offsets [start, stop), earliest date first
+        stop = self.horizon_days if stop is None else min(stop, self.horizon_days)
+        return (self.first_ordinal + np.arange(start, stop)) % self.horizon_days
+
+    def days_with_seats(self, city, ticket_class, n=1):
+        """Dates on which ``city`` has at least ``n`` seats left in ``ticket_class``."""
+        route = self._route_index.get(city)
+        cls = self._class_index.get(ticket_class)
+        if route is None or cls is None:
+            return []
+        first_day = np.datetime64(self.first_day, 'D')
+        row = self.seats[route, :, cls][self._slots_in_order()]
+        return (first_day + np.flatnonzero(row >= n)).tolist()
+
+    def availability_matrix(self, ticket_class=None, start_day=None, end_day=None):
+        """Seat counts for every route over [start_day, end_day], earliest date first.
+
+        Returns (dates, matrix) where matrix is [route, day] for one class, or
+        [route, day, class] when ``ticket_class`` is None.
+        """
+        first_ordinal = self.first_ordinal
+        start = max(0, start_day.toordinal() - first_ordinal) if start_day else 0
+        stop = end_day.toordinal() - first_ordinal + 1 if end_day else self.horizon_days
+        slots = self._slots_in_order(start, stop)
+        dates = [date.fromordinal(first_ordinal + offset) for offset in range(start, start + len(slots))]
+        if ticket_class is None:
+            return dates, self.seats[:, slots, :]
+        return dates, self.seats[:, slots, self._class_index[ticket_class]]
+
+    def snapshot(self):
+        first = self.first_day
+        return {
+            (route, first + timedelta(days=offset), ticket_class): self.seats.item(r, slot, c)
+            for r, route in enumerate(self.routes)
+            for offset, slot in enumerate(self._slots_in_order())
+            for c, ticket_class in enumerate(self.classes)
+        }
@@ -0,0 +1,145 @@
+"""Model backends for AirlineAssistant.
+
+Anything with ``generate_content(messages)`` returning an object with
+``.text``, and ``await generate_content_async(messages, stream=False)``
+returning the same or (with ``stream=True``) an async iterable of chunks with
+``.text``, can be passed as ``AirlineAssistant(model=...)``. ``create_model``
+picks the backend from FLIGHTLY_MODEL.
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import time
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeStream:
+    """Async iterable of response chunks, shaped like genai's streamed response."""
+
+    def __init__(self, tokens, first_token_delay, token_delay):
+        self.tokens = tokens
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.text = ""
+
+    async def __aiter__(self):
+        for i, token in enumerate(self.tokens):
+            await asyncio.sleep(self.first_token_delay if i == 0 else self.token_delay)
+            self.text += token
+            yield FakeResponse(token)
+
+
+class FakeModel:
+    """Offline stand-in for genai.GenerativeModel that emits tokens with configurable delays."""
+
+    def __init__(self, reply="Sure! I can help you book that flight. Could you share your travel date?",
+                 first_token_delay=0.2, token_delay=0.02):
+        # Split on spaces but keep them, so streamed chunks join back into the reply
+        self.tokens = [word + " " for word in reply.split(" ")]
+        self.tokens[-1] = self.tokens[-1].rstrip()
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.calls = 0
+
+    def generate_content(self, messages):
+        self.calls += 1
+        time.sleep(self.first_token_delay + self.token_delay * (len(self.tokens) - 1))
+        return FakeResponse("".join(self.tokens))
+
+    async def generate_content_async(self, messages, stream=False):
+        self.calls += 1
+        response = FakeStream(self.tokens, self.first_token_delay, self.token_delay)
+        if stream:
+            return response
+        async for _ in response:
+            pass
+        return FakeResponse(response.text)
+
+
+BOOKING_STATE = re.compile(r"Current booking details: (\{.*\})")
+# The order in which the simulated agent asks for missing booking details
+QUESTIONS = [
+    ("destination", "Where would you like to fly to?"),
+    ("date", "Which date would you like to travel? Please use YYYY-MM-DD."),
+    ("ticket_class", "Would you like economy, business or first class?"),
+    ("num_tickets", "How many tickets do you need?"),
+    ("email", "What email address should I send the confirmation to?"),
+]
+
+
+class SimulatedModel(FakeModel):
+    """Deterministic offline agent for benchmarks: replies follow the booking state in the prompt.
+
+    Each reply asks for the first missing booking detail, or confirms the
+    booking once all are known, padded to ``reply_tokens`` words. A reply
+    takes ``first_token_delay`` plus one ``1 / tokens_per_second`` per
+    further token; ``jitter`` scales each call's delays by a random factor in
+    [1 - jitter, 1 + jitter] drawn from a generator seeded with ``seed``.
+    """
+
+    def __init__(self, first_token_delay=0.3, tokens_per_second=50.0, reply_tokens=40, jitter=0.0, seed=0):
+        super().__init__(first_token_delay=first_token_delay,
+                         token_delay=1 / tokens_per_second if tokens_per_second else 0.0)
+        self.reply_tokens = reply_tokens
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self.prompt_chars = 0
+
+    def reply(self, messages):
+        self.prompt_chars += sum(len(message) for message in messages)
+        match = next((m for m in map(BOOKING_STATE.search, messages) if m), None)
+        booking = json.loads(match.group(1)) if match else {}
+        for field, question in QUESTIONS:
+            if not booking.get(field):
+                text = f"Happy to help with your trip. {question}"
+                break
+        else:
+            text = (f"Thank you, your booking of {booking['num_tickets']} {booking['ticket_class']} ticket(s) to "
+                    f"{booking['destination'].title()} on {booking['date']} is confirmed.")
+        words = text.split(" ")
+        # Pad with filler words so replies have a realistic length
+        words += ["ok"] * max(0, self.reply_tokens - len(words))
+        tokens = [word + " " for word in words]
+        tokens[-1] = tokens[-1].rstrip()
+        return tokens
+
+    def _delays(self):
+        scale = 1 + self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 1
+        return self.first_token_delay * scale, self.token_delay * scale
+
+    def generate_content(self, messages):
+        self.calls += 1
+        tokens = self.reply(messages)
+        first, per_token = self._delays()
+        time.sleep(first + per_token * (len(tokens) - 1))
+        return FakeResponse("".join(tokens))
+
+    async def generate_content_async(self, messages, stream=False):
+        self.calls += 1
+        response = FakeStream(self.reply(messages), *self._delays())
+        if stream:
+            return response
+        async for _ in response:
+            pass
+        return FakeResponse(response.text)
+
+
+def create_model(name=None):
+    """Model backend named by ``name`` or FLIGHTLY_MODEL: "gemini" (default) or "simulated"."""
+    name = (name or os.getenv('FLIGHTLY_MODEL', 'gemini')).lower()
+    if name == "simulated":
+        return SimulatedModel(
+            first_token_delay=float(os.getenv('FLIGHTLY_SIM_FIRST_TOKEN', '0.3')),
+            tokens_per_second=float(os.getenv('FLIGHTLY_SIM_TOKENS_PER_SECOND', '50')),
+        )
+    if name == "gemini":
+        import google.generativeai as genai
+        genai.configure(api_key=os.getenv('GOOGLE_GENAI_API_KEY', 'your-key-if-not-using-env'))
+        return genai.GenerativeModel("gemini-2.0-flash")
+    raise ValueError(f"Unknown model backend {name!r}; use 'gemini' or 'simulated'")
@@ -0,0 +1,213 @@
+import bisect
+import json
+import os
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process file locks, so no shared ledgers
+    fcntl = None
+
+
+class LoyaltyLedger:
+    """Append-only loyalty points ledger with cached per-customer balances.
+
+    Every change is an ``earn``, ``redeem`` or ``expire`` transaction appended
+    to a JSONL log (or kept in memory when ``path`` is None) and replayed on
+    open. Balances are kept per customer, so a lookup is one dictionary read.
+    Earned points are held as lots that expire ``expiry_days`` after they are
+    earned; redemptions use the oldest lots first. Lots are also bucketed by
+    expiry day, so ``expire`` only visits customers with points due that day.
+    Points stay in the balance until an expiry run removes them.
+
+    With ``shared=True`` several processes can append to the same log: each
+    change takes an exclusive lock on the file and first applies what other
+    processes appended, and lookups pick up new lines when the file has grown.
+    """
+
+    def __init__(self, path=None, expiry_days=365, clock=date.today, shared=False):
+        if shared and fcntl is None:
+            raise ValueError("Shared loyalty ledgers need POSIX file locks (fcntl)")
+        self.path = path
+        self.expiry_days = expiry_days
+        self.shared = shared and path is not None
+        self._clock = clock
+        self._offset = 0  # bytes of the log applied so far
+        self._lock = threading.Lock()
+        self._balances = defaultdict(int)
+        self._lots = defaultdict(list)  # customer -> [[expiry ordinal, points left], ...] oldest first
+        self._expiring = defaultdict(set)  # expiry ordinal -> customers with a lot due that day
+        self.transactions = 0
+        if path and os.path.exists(path):
+            self._replay()
+        self._file = open(path, "a", encoding="utf-8") if path else None
+
+    def _replay(self):
+        # Apply the lines appended since the last replay
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip():
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A torn final line from an interrupted write; everything before it is intact
+                        break
+                    self._apply(entry)
+                self._offset += len(line)
+
+    @contextmanager
+    def _locked(self):
+        # Shared ledgers hold the file lock across read-check-append, after catching up with other writers
+        with self._lock:
+            if not self.shared:
+                yield
+                return
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            try:
+                self._replay()
+                yield
+            finally:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    def _refresh(self):
+        if self.shared and os.fstat(self._file.fileno()).st_size > self._offset:
+            with self._lock:
+                self._replay()
+
+    def _apply(self, entry):
+        customer = entry["customer"]
+        points = entry["points"]
+        if entry["op"] == "earn":
+            lot = [date.fromisoformat(entry["expires"]).toordinal(), points]
+            lots = self._lots[customer]
+            bisect.insort(lots, lot)
+            self._expiring[lot[0]].add(customer)
+            self._balances[customer] += points
+        else:
+            self._take(customer, points, expired_before=entry.get("as_of"))
+        self.transactions += 1
+
+    def _take(self, customer, points, expired_before=None):
+        # Remove points from the oldest lots (only those expiring before ``expired_before``, if given)
+        lots = self._lots[customer]
+        cutoff = date.fromisoformat(expired_before).toordinal() if expired_before else None
+        taken = 0
+        while lots and taken < points and (cutoff is None or lots[0][0] < cutoff):
+            use = min(lots[0][1], points - taken)
+            lots[0][1] -= use
+            taken += use
+            if lots[0][1] == 0:
+                lots.pop(0)
+        self._balances[customer] -= taken
+        if not lots:
+            del self._lots[customer]
+        if not self._balances[customer]:
+            del self._balances[customer]
+        return taken
+
+    def _write(self, entries):
+        if self._file is not None and entries:
+            self._file.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            self._file.flush()
+            if self.shared:
+                self._offset = os.fstat(self._file.fileno()).st_size
+
+    def _earn_entry(self, customer, points, booking_id, today):
+        return {
+            "op": "earn", "customer": customer, "points": int(points), "booking_id": booking_id,
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "expires": (today + timedelta(days=self.expiry_days)).isoformat(),
+        }
+
+    def _earn_entries(self, earnings):
+        today = self._clock()
+        return [self._earn_entry(customer, points, booking_id, today)
+                for customer, points, booking_id in earnings if customer and points and int(points) > 0]
+
+    def earn(self, customer, points, booking_id=None):
+        return self.earn_many([(customer, points, booking_id)])
+
+    def earn_many(self, earnings):
+        """Record (customer, points, booking_id) earnings with a single log write."""
+        entries = self._earn_entries(earnings)
+        with self._locked():
+            self._write(entries)
+            for entry in entries:
+                self._apply(entry)
+        return len(entries)
+
+    def seed(self, earnings):
+        """Record earnings only if the ledger is still empty, so concurrent workers seed it once."""
+        with self._locked():
+            if self.transactions:
+                return 0
+            entries = self._earn_entries(earnings)
+            self._write(entries)
+            for entry in entries:
+                self._apply(entry)
+        return len(entries)
+
+    def redeem(self, customer, points):
+        """Spend points, oldest first; returns False (and changes nothing) if the balance is too low."""
+        points = int(points)
+        with self._locked():
+            if points <= 0 or self._balances.get(customer, 0) < points:
+                return False
+            entry = {"op": "redeem", "customer": customer, "points": points,
+                     "time": datetime.now().isoformat(timespec="seconds")}
+            self._write([entry])
+            self._apply(entry)
+            return True
+
+    def expire(self, as_of=None):
+        """Expire every lot due before ``as_of`` (default today); returns {customer: points expired}."""
+        as_of = as_of or self._clock()
+        cutoff = as_of.toordinal()
+        expired = {}
+        with self._locked():
+            due = [day for day in self._expiring if day < cutoff]
+            customers = set()
+            for day in due:
+                customers.update(self._expiring.pop(day))
+            entries = []
+            for customer in customers:
+                lots = self._lots.get(customer, [])
+                points = sum(left for expiry, left in lots if expiry < cutoff)
+                if points:
+                    entries.append({"op": "expire", "customer": customer, "points": points,
+                                    "as_of": as_of.isoformat(), "time": datetime.now().isoformat(timespec="seconds")})
+            # One write for the whole expiry run
+            self._write(entries)
+            for entry in entries:
+                self._apply(entry)
+                expired[entry["customer"]] = entry["points"]
+        return expired
+
+    def balance(self, customer):
+        self._refresh()
+        return self._balances.get(customer, 0)
+
+    def balances(self):
+        self._refresh()
+        with self._lock:
+            return dict(self._balances)
+
+    def lots(self, customer):
+        """Open lots for ``customer`` as (expiry date, points left), oldest first."""
+        self._refresh()
+        with self._lock:
+            return [(date.fromordinal(expiry), left) for expiry, left in self._lots.get(customer, [])]
+
+    def __len__(self):
+        return len(self._balances)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
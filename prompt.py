@@ -0,0 +1,57 @@
+import json
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token) without calling the model."""
+    return (len(text) + 3) // 4
+
+
+class ContextBuilder:
+    """Builds the model prompt for a chat turn within a token budget.
+
+    The system prompt is static, so it and its token count are computed once.
+    The last ``keep_turns`` (human, assistant) pairs are kept verbatim while
+    they fit the budget; older turns are dropped, since the details they
+    carried already live in the extracted booking state.
+    """
+
+    def __init__(self, system_message, max_tokens=4000, keep_turns=6):
+        self.system_message = system_message
+        self.system_tokens = estimate_tokens(system_message)
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+
+    def build(self, message, history, booking, conversation_state, loyalty_balance=None):
+        """Return (messages, prompt_tokens, turns_kept) for one chat turn."""
+        message_tokens = estimate_tokens(message)
+        booking_json = json.dumps(booking, separators=(',', ':'))
+
+        recent = []
+        # Reserve room for the system prompt, booking state (plus its short framing) and the new message
+        budget = self.max_tokens - self.system_tokens - estimate_tokens(booking_json) - message_tokens - 40
+        for human, assistant in reversed(history[-self.keep_turns:] if self.keep_turns else []):
+            turn_tokens = estimate_tokens(human) + estimate_tokens(assistant)
+            if turn_tokens > budget:
+                break
+            budget -= turn_tokens
+            recent.append((human, assistant))
+        recent.reverse()
+
+        omitted = len(history) - len(recent)
+        context = (
+            f"Current booking details: {booking_json}\n"
+            f"Conversation state: {conversation_state}"
+        )
+        if loyalty_balance is not None:
+            context += f"\nLoyalty points balance: {loyalty_balance}"
+        if omitted:
+            context += f"\n{omitted} earlier turns omitted; their details are in the booking state above."
+
+        messages = [self.system_message, context]
+        tokens = self.system_tokens + estimate_tokens(context) + message_tokens
+        for human, assistant in recent:
+            messages.append(human)
+            messages.append(assistant)
+            tokens += estimate_tokens(human) + estimate_tokens(assistant)
+        messages.append(message)
+        return messages, tokens, len(recent)
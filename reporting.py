@@ -0,0 +1,204 @@
+import json
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from itertools import islice
+
+import numpy as np
+
+FLIGHT_KEYS = ("destination", "ticket_class", "date")
+COLUMNS = FLIGHT_KEYS + ("email", "total_price", "num_tickets", "loyalty_points",
+                         "meal_preferences", "medical_assistance")
+
+
+def _number(value):
+    value = float(value or 0)
+    return int(value) if value.is_integer() else value
+
+
+def _requests(value):
+    """Individual requests in a stored meal/medical field (JSON list, dict or plain text)."""
+    if isinstance(value, str):
+        return _parse_requests(value)
+    if not value:
+        return ()
+    if isinstance(value, dict):
+        return tuple(key for key, wanted in value.items() if wanted)
+    if isinstance(value, (list, tuple)):
+        return tuple(str(item) for item in value if item)
+    return (str(value),)
+
+
+@lru_cache(maxsize=4096)
+def _parse_requests(text):
+    # Stored fields repeat a handful of JSON values, so each distinct one is parsed once
+    try:
+        value = json.loads(text) if text else None
+    except ValueError:
+        return (text,)
+    return _requests(value) if not isinstance(value, str) else ((value,) if value else ())
+
+
+class BookingReport:
+    """Running booking aggregates for ops dashboards.
+
+    Totals are kept per flight (destination, ticket_class, date): revenue,
+    tickets sold, and meal and medical request counts. Loyalty points are
+    kept per customer email. ``add``/``remove`` keep them current as bookings
+    are written, so reads never rescan the store. ``rebuild`` replaces them
+    with a backfill from the store. ``add_many`` is the batch
+    path for backfills (``add_columns`` takes columnar input directly): each
+    chunk is grouped column by column and summed with ``np.bincount``, giving
+    the same totals as adding rows one by one.
+    """
+
+    def __init__(self, seat_capacity):
+        self.seat_capacity = dict(seat_capacity)
+        self._lock = threading.Lock()
+        self._revenue = defaultdict(int)
+        self._tickets = defaultdict(int)
+        self._loyalty_points = defaultdict(int)
+        self._meals = defaultdict(int)
+        self._medical = defaultdict(int)
+
+    def _apply(self, booking, sign):
+        flight = tuple(booking.get(key) for key in FLIGHT_KEYS)
+        self._revenue[flight] += sign * _number(booking.get("total_price"))
+        self._tickets[flight] += sign * int(booking.get("num_tickets") or 0)
+        self._loyalty_points[booking.get("email")] += sign * int(booking.get("loyalty_points") or 0)
+        for meal in _requests(booking.get("meal_preferences")):
+            self._meals[flight + (meal,)] += sign
+        for need in _requests(booking.get("medical_assistance")):
+            self._medical[flight + (need,)] += sign
+
+    def add(self, booking):
+        with self._lock:
+            self._apply(booking, 1)
+
+    def remove(self, booking):
+        with self._lock:
+            self._apply(booking, -1)
+
+    def replace(self, old, new):
+        """Move an updated booking's totals from ``old`` to ``new`` in one step."""
+        with self._lock:
+            self._apply(old, -1)
+            self._apply(new, 1)
+
+    def rebuild(self, bookings):
+        """Replace every total with a backfill of ``bookings``; readers see the old or the new totals, never a mix."""
+        fresh = BookingReport(self.seat_capacity)
+        fresh.add_many(bookings)
+        with self._lock:
+            self._revenue, self._tickets = fresh._revenue, fresh._tickets
+            self._loyalty_points = fresh._loyalty_points
+            self._meals, self._medical = fresh._meals, fresh._medical
+
+    def add_many(self, bookings, chunk_size=50000):
+        """Batch-add bookings (e.g. a backfill of historical rows), one columnar chunk at a time."""
+        bookings = iter(bookings)
+        count = 0
+        while True:
+            chunk = list(islice(bookings, chunk_size))
+            if not chunk:
+                return count
+            self._add_chunk(chunk)
+            count += len(chunk)
+
+    def _add_chunk(self, chunk):
+        self.add_columns({column: [row.get(column) for row in chunk] for column in COLUMNS})
+
+    def add_columns(self, columns):
+        """Batch-add bookings given column by column (e.g. a DataFrame chunk or a SQL fetch)."""
+        destinations, classes, dates = (list(columns[key]) for key in FLIGHT_KEYS)
+        rows = len(destinations)
+        flights = {}
+        flight_codes = np.fromiter(
+            (flights.setdefault(flight, len(flights)) for flight in zip(destinations, classes, dates)),
+            dtype=np.int64, count=rows
+        )
+        emails = {}
+        email_codes = np.fromiter(
+            (emails.setdefault(email, len(emails)) for email in columns["email"]), dtype=np.int64, count=rows
+        )
+        prices = np.array([float(value or 0) for value in columns["total_price"]], dtype=np.float64)
+        tickets = np.array([int(value or 0) for value in columns["num_tickets"]], dtype=np.int64)
+        points = np.array([int(value or 0) for value in columns["loyalty_points"]], dtype=np.int64)
+        revenue = np.bincount(flight_codes, weights=prices, minlength=len(flights))
+        ticket_totals = np.bincount(flight_codes, weights=tickets, minlength=len(flights)).astype(np.int64)
+        point_totals = np.bincount(email_codes, weights=points, minlength=len(emails)).astype(np.int64)
+
+        meals = defaultdict(int)
+        medical = defaultdict(int)
+        for code, meal_field, medical_field in zip(flight_codes.tolist(), columns["meal_preferences"],
+                                                   columns["medical_assistance"]):
+            for meal in _requests(meal_field):
+                meals[code, meal] += 1
+            for need in _requests(medical_field):
+                medical[code, need] += 1
+
+        flight_keys = list(flights)
+        with self._lock:
+            for flight, total, sold in zip(flight_keys, revenue.tolist(), ticket_totals.tolist()):
+                self._revenue[flight] += _number(total)
+                self._tickets[flight] += sold
+            for email, total in zip(emails, point_totals.tolist()):
+                self._loyalty_points[email] += total
+            for (code, meal), count in meals.items():
+                self._meals[flight_keys[code] + (meal,)] += count
+            for (code, need), count in medical.items():
+                self._medical[flight_keys[code] + (need,)] += count
+
+    @staticmethod
+    def _rollup(totals, by):
+        # Re-group per-flight totals by a subset of FLIGHT_KEYS (plus the request name, when present)
+        positions = [FLIGHT_KEYS.index(key) for key in by]
+        grouped = defaultdict(int)
+        for key, value in totals.items():
+            if value:
+                grouped[tuple(key[p] for p in positions) + key[len(FLIGHT_KEYS):]] += value
+        return dict(grouped)
+
+    def revenue(self, by=FLIGHT_KEYS):
+        """Revenue grouped by any of destination, ticket_class and date."""
+        with self._lock:
+            return self._rollup(self._revenue, by)
+
+    def tickets_sold(self, by=FLIGHT_KEYS):
+        with self._lock:
+            return self._rollup(self._tickets, by)
+
+    def load_factors(self):
+        """Share of each flight's seats that is sold, per (destination, ticket_class, date)."""
+        with self._lock:
+            return {
+                flight: sold / self.seat_capacity[flight[1]]
+                for flight, sold in self._tickets.items()
+                if sold and flight[1] in self.seat_capacity
+            }
+
+    def loyalty_points(self):
+        """Outstanding loyalty points per customer email."""
+        with self._lock:
+            return {email: points for email, points in self._loyalty_points.items() if points}
+
+    def meal_requests(self, by=("destination", "date")):
+        """Meal request counts per flight and meal, for catering."""
+        with self._lock:
+            return self._rollup(self._meals, by)
+
+    def medical_requests(self, by=("destination", "date")):
+        """Medical assistance request counts per flight and need, for ground staff."""
+        with self._lock:
+            return self._rollup(self._medical, by)
+
+    def snapshot(self):
+        """Every aggregate at full detail; equal snapshots mean equal reports."""
+        return {
+            "revenue": self.revenue(),
+            "tickets_sold": self.tickets_sold(),
+            "load_factors": self.load_factors(),
+            "loyalty_points": self.loyalty_points(),
+            "meal_requests": self.meal_requests(FLIGHT_KEYS),
+            "medical_requests": self.medical_requests(FLIGHT_KEYS),
+        }
@@ -0,0 +1,268 @@
+import threading
+
+# Used for routes whose catalog entry has no seat_config
+DEFAULT_SEAT_CONFIG = {
+    "economy": {"rows": "20-50", "layout": "3-3-3"},
+    "business": {"rows": "10-19", "layout": "2-2-2"},
+    "first": {"rows": "1-9", "layout": "1-2-1"},
+}
+SEAT_LETTERS = "ABCDEFGHJK"  # no I, as on boarding passes
+
+
+class SeatLayout:
+    """One cabin's seats (from a row range and a layout like "3-3-3") as bit positions.
+
+    Seat ``i`` is bit ``i``, numbered row by row from the front and left to
+    right within a row, so neighbouring bits are neighbouring seats. Each
+    seat category (window/aisle/middle, front/middle/back, extra legroom) is a
+    bitmask, so finding a free seat of a category is one AND plus a
+    lowest-set-bit lookup on a Python int.
+    """
+
+    def __init__(self, rows, layout):
+        first_row, last_row = (int(part) for part in rows.split("-"))
+        blocks = [int(part) for part in layout.split("-")]
+        width = sum(blocks)
+        self.rows = list(range(first_row, last_row + 1))
+        self.labels = []
+        self.location = {"window": 0, "aisle": 0, "middle": 0}
+        self.section = {"front": 0, "middle": 0, "back": 0}
+        self.special = {"extra legroom": 0}
+        block_of = []
+        for block, size in enumerate(blocks):
+            block_of.extend((block, pos, size) for pos in range(size))
+        for row_idx, row in enumerate(self.rows):
+            section = ("front", "middle", "back")[min(2, row_idx * 3 // len(self.rows))]
+            for col in range(width):
+                bit = 1 << len(self.labels)
+                self.labels.append(f"{row}{SEAT_LETTERS[col]}")
+                block, pos, size = block_of[col]
+                if col == 0 or col == width - 1:
+                    self.location["window"] |= bit
+                elif pos == 0 or pos == size - 1:
+                    self.location["aisle"] |= bit
+                else:
+                    self.location["middle"] |= bit
+                self.section[section] |= bit
+                if row_idx == 0:
+                    self.special["extra legroom"] |= bit
+        self.width = width
+        self.all_seats = (1 << len(self.labels)) - 1
+        self._index = {label: i for i, label in enumerate(self.labels)}
+        # Start positions of k adjacent seats, within one block (no aisle between) or anywhere in one row
+        self._block_starts = {}
+        self._row_starts = {}
+        for k in range(1, width + 1):
+            block_mask = row_mask = 0
+            for col in range(width - k + 1):
+                block, pos, size = block_of[col]
+                same_block = pos + k <= size
+                for row_idx in range(len(self.rows)):
+                    bit = 1 << (row_idx * width + col)
+                    row_mask |= bit
+                    if same_block:
+                        block_mask |= bit
+            self._block_starts[k] = block_mask
+            self._row_starts[k] = row_mask
+
+    def __len__(self):
+        return len(self.labels)
+
+    def mask(self, preferences):
+        """Bitmask of the seats matching ``preferences`` ({"location", "section", "special"})."""
+        mask = self.all_seats
+        if not preferences:
+            return mask
+        location = preferences.get("location")
+        if location in self.location:
+            mask &= self.location[location]
+        section = preferences.get("section")
+        if section in self.section:
+            mask &= self.section[section]
+        special = preferences.get("special") or []
+        for need in [special] if isinstance(special, str) else special:
+            if need in self.special:
+                mask &= self.special[need]
+        return mask
+
+    def bits(self, labels):
+        """Bits of the given seat labels; labels not in this layout (e.g. after a seat_config change) are skipped."""
+        bits = 0
+        index = self._index
+        for label in labels:
+            if label in index:
+                bits |= 1 << index[label]
+        return bits
+
+    def seats(self, bits):
+        labels = []
+        while bits:
+            low = bits & -bits
+            labels.append(self.labels[low.bit_length() - 1])
+            bits ^= low
+        return labels
+
+    def choose(self, free, n, preferences=None):
+        """Bits of ``n`` free seats: adjacent in one block if possible, then one row, then the frontmost.
+
+        Preferences are tried in full, then with only the location, then not at all.
+        """
+        if n <= 0 or (free & self.all_seats).bit_count() < n:
+            return 0
+        masks = [self.mask(preferences)]
+        if preferences and preferences.get("location") in self.location:
+            masks.append(self.location[preferences["location"]])
+        masks.append(self.all_seats)
+        if n <= self.width:
+            # runs: bit s set when seats s..s+n-1 are all free
+            runs = free
+            for j in range(1, n):
+                runs &= free >> j
+            for starts in (self._block_starts[n], self._row_starts[n]):
+                candidates = runs & starts
+                if not candidates:
+                    continue
+                for mask in masks:
+                    # Starts whose run includes at least one seat matching the preferences
+                    covers = 0
+                    for j in range(n):
+                        covers |= mask >> j
+                    matching = candidates & covers
+                    if matching:
+                        start = (matching & -matching).bit_length() - 1
+                        return ((1 << n) - 1) << start
+        # Not enough adjacent seats: take the frontmost free seats, preferred ones first
+        chosen = 0
+        for pool in (free & masks[0], free):
+            pool &= ~chosen
+            while pool and chosen.bit_count() < n:
+                low = pool & -pool
+                chosen |= low
+                pool ^= low
+        return chosen
+
+
+class SeatMap:
+    """Per-flight, per-date seat bitmaps for every route and class.
+
+    A flight's free seats are one Python int keyed by (route, date ordinal,
+    class), created on the first booking for that flight, so untouched
+    flights cost nothing and hundreds of routes over hundreds of days stay
+    small. ``drop_before`` discards flights that have left the window.
+    """
+
+    def __init__(self, layouts):
+        self.layouts = layouts  # (route, class) -> SeatLayout
+        self._free = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_flights(cls, flights):
+        """Build layouts from each route's ``seat_config`` in FlightDatabase.flights."""
+        shared = {}
+        layouts = {}
+        for route, flight in flights.items():
+            config = flight.get("seat_config") or DEFAULT_SEAT_CONFIG
+            for ticket_class, cabin in config.items():
+                key = (cabin["rows"], cabin["layout"])
+                if key not in shared:
+                    shared[key] = SeatLayout(*key)
+                layouts[route, ticket_class] = shared[key]
+        return cls(layouts)
+
+    def _key(self, route, day, ticket_class):
+        layout = self.layouts.get((route, ticket_class))
+        return layout, (route, day.toordinal(), ticket_class)
+
+    def assign(self, route, day, ticket_class, n, preferences=None):
+        """Assign ``n`` seats and return their labels (e.g. ["21A", "21B"]), or [] if they do not fit."""
+        layout, key = self._key(route, day, ticket_class)
+        if layout is None:
+            return []
+        with self._lock:
+            free = self._free.get(key, layout.all_seats)
+            chosen = layout.choose(free, n, preferences)
+            if not chosen:
+                return []
+            self._free[key] = free & ~chosen
+        return layout.seats(chosen)
+
+    def reassign(self, route, day, ticket_class, held, n, preferences=None):
+        """Swap a party's ``held`` seats for ``n`` seats in one step, so its own seats can be reused.
+
+        Returns the new labels, or [] (leaving ``held`` taken) if they do not fit.
+        """
+        layout, key = self._key(route, day, ticket_class)
+        if layout is None:
+            return []
+        held_bits = layout.bits(held)
+        with self._lock:
+            free = self._free.get(key, layout.all_seats) | held_bits
+            chosen = layout.choose(free, n, preferences)
+            if not chosen:
+                return []
+            free &= ~chosen
+            if free == layout.all_seats:
+                self._free.pop(key, None)
+            else:
+                self._free[key] = free
+        return layout.seats(chosen)
+
+    def hold(self, route, day, ticket_class, labels):
+        """Mark specific seats taken (e.g. when reloading stored bookings); returns False if any is not free."""
+        layout, key = self._key(route, day, ticket_class)
+        if layout is None or not labels:
+            return False
+        bits = layout.bits(labels)
+        with self._lock:
+            free = self._free.get(key, layout.all_seats)
+            if free & bits != bits:
+                return False
+            self._free[key] = free & ~bits
+        return True
+
+    def release(self, route, day, ticket_class, labels):
+        layout, key = self._key(route, day, ticket_class)
+        if layout is None or not labels:
+            return
+        bits = layout.bits(labels)
+        with self._lock:
+            free = self._free.get(key, layout.all_seats) | bits
+            if free == layout.all_seats:
+                self._free.pop(key, None)
+            else:
+                self._free[key] = free
+
+    def load(self, route, day, ticket_class, taken):
+        """Replace one flight's seat map with just the ``taken`` seat labels held."""
+        layout, key = self._key(route, day, ticket_class)
+        if layout is None:
+            return
+        free = layout.all_seats & ~layout.bits(taken)
+        with self._lock:
+            if free == layout.all_seats:
+                self._free.pop(key, None)
+            else:
+                self._free[key] = free
+
+    def free_seats(self, route, day, ticket_class):
+        layout, key = self._key(route, day, ticket_class)
+        if layout is None:
+            return []
+        return layout.seats(self._free.get(key, layout.all_seats))
+
+    def free_count(self, route, day, ticket_class):
+        layout, key = self._key(route, day, ticket_class)
+        if layout is None:
+            return 0
+        return self._free.get(key, layout.all_seats).bit_count()
+
+    def drop_before(self, day):
+        """Forget seat maps of flights before ``day``."""
+        ordinal = day.toordinal()
+        with self._lock:
+            for key in [key for key in self._free if key[1] < ordinal]:
+                del self._free[key]
+
+    def __len__(self):
+        return len(self._free)
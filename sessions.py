@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class BookingSession:
+    """Booking state for one chat user."""
+
+    __slots__ = ("current_booking", "conversation_state", "last_seen")
+
+    def __init__(self, now):
+        self.current_booking = {}
+        self.conversation_state = "initial"
+        self.last_seen = now
+
+
+class SessionManager:
+    """Keeps one BookingSession per chat session with idle-TTL and size-cap eviction.
+
+    Sessions are kept in least-recently-used order, so expired sessions are
+    always at the front and each eviction is O(1).
+    """
+
+    def __init__(self, ttl_seconds=1800, max_sessions=10000, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._clock = clock
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def get(self, session_id):
+        """Return the session for ``session_id``, creating it if needed."""
+        now = self._clock()
+        with self._lock:
+            self._evict_expired(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = BookingSession(now)
+                self._sessions[session_id] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evicted += 1
+            else:
+                session.last_seen = now
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def drop(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def evict_expired(self):
+        with self._lock:
+            return self._evict_expired(self._clock())
+
+    def _evict_expired(self, now):
+        count = 0
+        cutoff = now - self.ttl_seconds
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_seen > cutoff:
+                break
+            self._sessions.popitem(last=False)
+            count += 1
+        self.evicted += count
+        return count
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
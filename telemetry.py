@@ -0,0 +1,199 @@
+import cProfile
+import json
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+log = logging.getLogger("flightly")
+
+# Latency buckets in seconds, from sub-millisecond lookups to slow model calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def configure_logging(level=None):
+    """Log to stderr at FLIGHTLY_LOG_LEVEL (default INFO); DEBUG adds per-turn details."""
+    logging.basicConfig(level=(level or os.getenv('FLIGHTLY_LOG_LEVEL', 'INFO')).upper(), format="%(message)s")
+
+
+def _label_text(labels):
+    return ",".join(f'{key}="{value}"' for key, value in labels)
+
+
+def _series(name, labels):
+    return f"{name}{{{_label_text(labels)}}}" if labels else name
+
+
+class Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class Metrics:
+    """Counters and latency histograms, with timing spans for hot paths.
+
+    Series are keyed by name and sorted label pairs. ``render_prometheus``
+    produces the Prometheus text exposition format. When ``sink_path`` is
+    set, every finished span is also appended to that file as a JSON line.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, sink_path=None):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._sink = open(sink_path, "a", encoding="utf-8") if sink_path else None
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.counts[bucket] += 1
+            histogram.sum += value
+            histogram.count += 1
+
+    @contextmanager
+    def span(self, name, **labels):
+        """Time the block into the ``flightly_span_seconds`` histogram under ``span=name``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe("flightly_span_seconds", elapsed, span=name, **labels)
+            if self._sink is not None:
+                line = json.dumps({"span": name, "seconds": elapsed, "time": time.time(), **labels}) + "\n"
+                with self._lock:
+                    self._sink.write(line)
+
+    def counter(self, name, **labels):
+        return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def histogram(self, name, **labels):
+        """(count, sum) of a histogram series, or (0, 0.0) if nothing was observed."""
+        histogram = self._histograms.get((name, tuple(sorted(labels.items()))))
+        return (histogram.count, histogram.sum) if histogram else (0, 0.0)
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(
+                (key, list(h.counts), h.sum, h.count) for key, h in self._histograms.items()
+            )
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{_series(name, labels)} {value}")
+        for (name, labels), counts, total, count in histograms:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} histogram")
+            prefix = _label_text(labels) + "," if labels else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f"{_series(name + '_sum', labels)} {total}")
+            lines.append(f"{_series(name + '_count', labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        if self._sink is not None:
+            with self._lock:
+                self._sink.flush()
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# Only one cProfile profiler can be active per process (Python 3.12+ raises ValueError for a second)
+_profiling = threading.Lock()
+
+
+class RequestProfiler:
+    """Opt-in per-request profiler: profiles a random ``rate`` share of requests with cProfile.
+
+    Each sampled request writes ``<name>-<time>.prof`` to ``directory``, for
+    ``python -m pstats`` or snakeviz. One request is profiled at a time: a
+    request sampled while another profile is running, or nested inside one,
+    is not profiled on its own.
+    """
+
+    def __init__(self, rate=0.0, directory="profiles"):
+        self.rate = rate
+        self.directory = directory
+
+    @contextmanager
+    def profile(self, name):
+        if not self.rate or random.random() >= self.rate or not _profiling.acquire(blocking=False):
+            yield
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # profiled from outside, e.g. python -m cProfile
+            _profiling.release()
+            yield
+            return
+        try:
+            yield
+        finally:
+            profiler.disable()
+            _profiling.release()
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{name}-{time.time_ns()}.prof")
+            profiler.dump_stats(path)
+            log.debug("🔬 Profile written to %s", path)
+
+
+def serve_metrics(port, registry=None, host="0.0.0.0"):
+    """Serve ``GET /metrics`` in Prometheus text format from a background thread."""
+    registry = registry or metrics
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+# Process-wide defaults used by the assistant and booking system
+metrics = Metrics(sink_path=os.getenv('FLIGHTLY_METRICS_JSONL'))
+profiler = RequestProfiler(
+    rate=float(os.getenv('FLIGHTLY_PROFILE_RATE', '0')),
+    directory=os.getenv('FLIGHTLY_PROFILE_DIR', 'profiles')
+)